@@ -1,15 +1,44 @@
 #!/usr/bin/env python
+import logging
+import os
 from argparse import ArgumentParser
 from itertools import pairwise
 
 import uvicorn
 
+from prefork import PreforkServer
+
+logger = logging.getLogger("uvicorn.error")
+
+
+def preload() -> None:
+    from app import app
+
+    app.state.model.preload()
+
+
+def warn_unshared_state(workers: int) -> None:
+    from common import config
+
+    if getattr(config, "shared_backend", "") in ("", "local"):
+        logger.warning(
+            f"{workers} workers share no backend (see shared_backend): each has "
+            "rate limits of its own, and a logout revokes the token only in the "
+            "worker serving it, the others accepting it until it expires"
+        )
+
 
 def main() -> None:
     parser = ArgumentParser()
     parser.add_argument("--port", type=int, default=8000)
     parser.add_argument("--host", default="localhost")
     parser.add_argument("--no-reload", action="store_false")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=int(os.environ.get("HS_WORKERS", 1)),
+        help="Workers to fork after loading the app once. Implies --no-reload",
+    )
     args, unknown_args = parser.parse_known_args()
     uvicorn_kwargs = {
         "host": args.host,
@@ -22,7 +51,13 @@ def main() -> None:
         else:
             uvicorn_kwargs[arg1[2:]] = arg2
 
-    uvicorn.run("app:app", **uvicorn_kwargs)
+    if args.workers > 1:
+        uvicorn_kwargs["reload"] = False
+        config = uvicorn.Config("app:app", **uvicorn_kwargs)
+        warn_unshared_state(args.workers)
+        PreforkServer(config, workers=args.workers, preload=preload).run()
+    else:
+        uvicorn.run("app:app", **uvicorn_kwargs)
 
 
 if __name__ == "__main__":
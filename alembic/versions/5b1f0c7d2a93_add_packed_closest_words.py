@@ -0,0 +1,55 @@
+"""add packed closest words
+
+Revision ID: 5b1f0c7d2a93
+Revises: 342c9a594f33
+Create Date: 2026-10-18 10:12:31.840217
+
+"""
+
+import itertools
+from typing import Sequence
+from typing import Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "5b1f0c7d2a93"
+down_revision: Union[str, None] = "342c9a594f33"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+secret_word = sa.table(
+    "secretword",
+    sa.column("id", sa.Integer),
+    sa.column("closest_words", sa.Text),
+)
+closest1000 = sa.table(
+    "closest1000",
+    sa.column("secret_word_id", sa.Integer),
+    sa.column("word", sa.String),
+    sa.column("out_of_1000", sa.Integer),
+)
+
+
+def upgrade() -> None:
+    op.add_column("secretword", sa.Column("closest_words", sa.Text(), nullable=True))
+
+    bind = op.get_bind()
+    rows = bind.execute(
+        sa.select(closest1000.c.secret_word_id, closest1000.c.word).order_by(
+            closest1000.c.secret_word_id, closest1000.c.out_of_1000
+        )
+    )
+    for secret_word_id, words in itertools.groupby(rows, key=lambda row: row[0]):
+        bind.execute(
+            secret_word.update()
+            .where(secret_word.c.id == secret_word_id)
+            .values(closest_words="\n".join(word for _, word in words))
+        )
+
+
+def downgrade() -> None:
+    op.drop_column("secretword", "closest_words")
@@ -0,0 +1,34 @@
+"""add solver reserved
+
+Revision ID: 9c4e7a1b6d02
+Revises: 5b1f0c7d2a93
+Create Date: 2026-10-18 14:02:47.118305
+
+"""
+
+from typing import Sequence
+from typing import Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "9c4e7a1b6d02"
+down_revision: Union[str, None] = "5b1f0c7d2a93"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "secretword",
+        sa.Column("solver_reserved", sa.Integer(), nullable=False, server_default="0"),
+    )
+    # ranks handed out so far must never be reserved again
+    op.execute("UPDATE secretword SET solver_reserved = solver_count")
+
+
+def downgrade() -> None:
+    # ranks reserved but not handed out are given up
+    op.drop_column("secretword", "solver_reserved")
@@ -0,0 +1,66 @@
+"""backfill subscription expiry
+
+Revision ID: d3a8f5e61c47
+Revises: 9c4e7a1b6d02
+Create Date: 2026-10-18 15:21:09.402671
+
+"""
+
+import itertools
+from typing import Sequence
+from typing import Union
+
+import sqlalchemy as sa
+from dateutil.relativedelta import relativedelta
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d3a8f5e61c47"
+down_revision: Union[str, None] = "9c4e7a1b6d02"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+user = sa.table(
+    "user",
+    sa.column("id", sa.Integer),
+    sa.column("subscription_expiry", sa.DateTime),
+)
+user_subscription = sa.table(
+    "usersubscription",
+    sa.column("user_id", sa.Integer),
+    sa.column("amount", sa.Float),
+    sa.column("timestamp", sa.DateTime),
+)
+
+
+def upgrade() -> None:
+    # the column was created with the user table, but never written
+    bind = op.get_bind()
+    bind.execute(sa.update(user).values(subscription_expiry=None))
+    rows = bind.execute(
+        sa.select(
+            user_subscription.c.user_id,
+            user_subscription.c.amount,
+            user_subscription.c.timestamp,
+        ).order_by(user_subscription.c.user_id, user_subscription.c.timestamp)
+    )
+    # same as UserLogic.extend_subscription
+    for user_id, subscriptions in itertools.groupby(rows, key=lambda row: row[0]):
+        expiry = None
+        for _, amount, timestamp in subscriptions:
+            start = timestamp if expiry is None or expiry < timestamp else expiry
+            round_amount = round(amount)
+            expiry = start + relativedelta(
+                months=round_amount // 3, days=10 * (round_amount % 3)
+            )
+        bind.execute(
+            sa.update(user)
+            .where(user.c.id == user_id)
+            .values(subscription_expiry=expiry)
+        )
+
+
+def downgrade() -> None:
+    op.execute(sa.update(user).values(subscription_expiry=None))
@@ -0,0 +1,48 @@
+"""user stats table
+
+Revision ID: e81b2f4c9a30
+Revises: d3a8f5e61c47
+Create Date: 2026-10-18 16:40:12.553019
+
+"""
+
+from typing import Sequence
+from typing import Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e81b2f4c9a30"
+down_revision: Union[str, None] = "d3a8f5e61c47"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # rows are built from the history on first use, or by
+    # scripts/rebuild_user_stats.py
+    op.create_table(
+        "userstats",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("games_played", sa.Integer(), nullable=False),
+        sa.Column("games_won", sa.Integer(), nullable=False),
+        sa.Column("total_guesses_to_win", sa.Integer(), nullable=False),
+        sa.Column("best_rank", sa.Integer(), nullable=True),
+        sa.Column("current_streak", sa.Integer(), nullable=False),
+        sa.Column("longest_streak", sa.Integer(), nullable=False),
+        sa.Column("last_game_date", sa.Date(), nullable=True),
+        sa.Column("last_won_date", sa.Date(), nullable=True),
+        sa.ForeignKeyConstraint(
+            ["user_id"],
+            ["user.id"],
+        ),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("user_id"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("userstats")
@@ -0,0 +1,33 @@
+"""secret change table
+
+Revision ID: f2b7c1d94e56
+Revises: e81b2f4c9a30
+Create Date: 2026-10-18 19:05:41.207316
+
+"""
+
+from typing import Sequence
+from typing import Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "f2b7c1d94e56"
+down_revision: Union[str, None] = "e81b2f4c9a30"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "secretchange",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("game_date", sa.Date(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("secretchange")
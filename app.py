@@ -1,33 +1,43 @@
 from __future__ import annotations
 
+import asyncio
+import contextlib
 import datetime
 import hashlib
 import os
-import time
-from collections import defaultdict
 from typing import TYPE_CHECKING
 
-import jwt
+import requests
 import uvicorn
 from fastapi import FastAPI
 from fastapi import HTTPException
-from fastapi import Request
-from fastapi import Response
 from fastapi import status
 from fastapi.responses import JSONResponse
 from fastapi.staticfiles import StaticFiles
 
 from common import config
+from common.backend import get_shared_backend
 from common.error import HSError
+from common.logger import logger
+from common.middleware import KnownErrorsMiddleware
+from common.middleware import RateLimitMiddleware
+from common.rate_limiter import RateLimiter
+from common.rate_limiter import RouteRateLimiter
+from common.session import get_engine
 from common.session import get_model
-from common.session import get_session
-from logic.user_logic import UserLogic
+from logic.game_logic import CacheSecretLogic
+from logic.game_logic import GameContextLogic
+from logic.game_logic import SecretChanges
+from logic.game_logic import SecretLogic
+from logic.game_logic import SolverCounter
+from logic.game_logic import VectorLogic
+from logic.user_logic import UserClueLogic
+from logic.user_logic import UserHistoryWriter
 from routers import routers
-from routers.base import get_logics
+from routers.base import get_game_context
 
 if TYPE_CHECKING:
-    from typing import Awaitable
-    from typing import Callable
+    from typing import AsyncIterator
 
 STATIC_FOLDER = "static"
 js_hasher = hashlib.sha3_256()
@@ -40,19 +50,83 @@ with open(STATIC_FOLDER + "/styles.css", "rb") as f:
     css_hasher.update(f.read())
 CSS_VERSION = css_hasher.hexdigest()[:6]
 
-app = FastAPI()
+
+async def alert(text: str) -> None:
+    try:
+        await asyncio.to_thread(
+            requests.post, config.alerts_webhook, json={"text": text}, timeout=10
+        )
+    except requests.RequestException:
+        logger.exception("Could not send alert")
+
+
+def get_rate_limiter(limit: int, period: int) -> RouteRateLimiter:
+    max_keys = getattr(config, "rate_limit_max_keys", 100_000)
+    backend = get_shared_backend()
+    # by default, guesses and static files do not use up the budget of pages
+    routes = getattr(
+        config,
+        "rate_limits",
+        {prefix: {} for prefix in ("/api/distance", "/static/")},
+    )
+    return RouteRateLimiter(
+        default=RateLimiter(
+            limit, period, max_keys=max_keys, backend=backend, name="default"
+        ),
+        routes={
+            prefix: RateLimiter(
+                route.get("limit", limit),
+                route.get("period", period),
+                max_keys=max_keys,
+                backend=backend,
+                name=prefix,
+            )
+            for prefix, route in routes.items()
+        },
+    )
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    tasks = [
+        asyncio.create_task(app.state.game_contexts.run_prewarmer(alert)),
+        asyncio.create_task(app.state.secret_changes.run()),
+    ]
+    if app.state.history_writer is not None:
+        tasks.append(asyncio.create_task(app.state.history_writer.run()))
+    yield
+    for task in tasks:
+        task.cancel()
+    for task in tasks:
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+    if app.state.history_writer is not None:
+        await app.state.history_writer.flush()
+
+
+app = FastAPI(lifespan=lifespan)
 app.state.limit = int(os.environ.get("LIMIT", getattr(config, "limit", 10)))
 app.state.period = int(os.environ.get("PERIOD", getattr(config, "period", 20)))
+app.state.rate_limiter = get_rate_limiter(app.state.limit, app.state.period)
 app.state.videos = config.videos
-app.state.current_timeframe = 0
-app.state.usage = defaultdict(int)
 app.state.quotes = config.quotes
 app.state.notification = config.notification
 app.state.js_version = JS_VERSION
 app.state.css_version = CSS_VERSION
 app.state.model = get_model()
 app.state.google_app = config.google_app
-app.state.session = get_session()
+app.state.engine = get_engine()
+app.state.solver_counter = SolverCounter(
+    app.state.engine, block_size=getattr(config, "solver_block_size", 10)
+)
+if getattr(config, "history_write_behind", False):
+    app.state.history_writer = UserHistoryWriter(
+        app.state.engine,
+        batch_size=getattr(config, "history_batch_size", 500),
+        flush_interval=getattr(config, "history_flush_interval", 1.0),
+    )
+else:
+    app.state.history_writer = None
 
 
 try:
@@ -63,97 +137,50 @@ try:
 except ValueError:
     delta = 0
 app.state.days_delta = datetime.timedelta(days=delta)
+app.state.game_contexts = GameContextLogic(
+    app.state.engine,
+    app.state.model,
+    days_delta=app.state.days_delta,
+    backend=get_shared_backend(),
+)
+app.state.secret_changes = SecretChanges(
+    app.state.engine, poll_interval=getattr(config, "secret_poll_interval", 5.0)
+)
+# the game contexts last, so that they are rebuilt from fresh caches
+for invalidate in (
+    SecretLogic.invalidate,
+    VectorLogic.invalidate,
+    CacheSecretLogic.invalidate,
+    UserClueLogic.invalidate,
+    app.state.game_contexts.invalidate,
+):
+    app.state.secret_changes.subscribe(invalidate)
 app.mount(f"/{STATIC_FOLDER}", StaticFiles(directory=STATIC_FOLDER), name=STATIC_FOLDER)
 for router in routers:
     app.include_router(router)
 
 
-def request_is_limited(key: str) -> bool:
-    now = int(time.time())
-    current = now - now % app.state.period
-    if app.state.current_timeframe != current:
-        app.state.current_timeframe = current
-        for ip, usage in app.state.usage.items():
-            if usage > app.state.limit * 0.75:
-                app.state.usage[ip] = usage // 2
-            else:
-                app.state.usage[ip] = 0
-        app.state.usage = defaultdict(
-            int, {ip: usage for ip, usage in app.state.usage.items() if usage > 0}
-        )
-    app.state.usage[key] += 1
-    if app.state.usage[key] > app.state.limit:
-        return True
-    else:
-        return False
-
-
-def get_idenitifier(request: Request) -> str:
-    forwarded = request.headers.get("X-Forwarded-For")
-    if forwarded:
-        return forwarded.split(",")[0].strip()
-    if request.client:
-        return request.client.host
-    else:
-        return "unknown"
-
-
-@app.middleware("http")
-async def is_limited(
-    request: Request, call_next: Callable[[Request], Awaitable[Response]]
-) -> Response:
-    identifier = get_idenitifier(request)
-    if request_is_limited(key=identifier):
-        return JSONResponse(content="", status_code=status.HTTP_429_TOO_MANY_REQUESTS)
-    response = await call_next(request)
-    return response
-
-
-@app.middleware("http")
-async def get_user(
-    request: Request,
-    call_next: Callable[[Request], Awaitable[Response]],
-) -> Response:
-    access_token = request.cookies.get("access_token")
-    if access_token is not None:
-        try:
-            payload = jwt.decode(
-                access_token, config.jwt_key, algorithms=[config.jwt_algorithm]
-            )
-            user_logic = UserLogic(request.app.state.session)
-            user = await user_logic.get_user(payload["sub"])
-            if user is not None:
-                request.state.user = user
-                if expiry := user_logic.get_subscription_expiry(request.state.user):
-                    is_active = expiry > datetime.datetime.now(datetime.UTC)
-                    request.state.has_active_subscription = is_active
-                    request.state.expires_at = str(expiry.date())
-        except jwt.exceptions.ExpiredSignatureError:
-            request.state.user = None
-    else:
-        request.state.user = None
-    return await call_next(request)
-
-
-@app.middleware("http")
-async def catch_known_errors(
-    request: Request, call_next: Callable[[Request], Awaitable[Response]]
-) -> Response:
-    try:
-        return await call_next(request)
-    except HSError as e:
-        return JSONResponse(content=str(e), status_code=status.HTTP_400_BAD_REQUEST)
+# pure ASGI rather than @app.middleware("http"), whose wrapping of every request
+# in tasks and streams costs throughput; the last added runs first
+app.add_middleware(RateLimitMiddleware)
+app.add_middleware(KnownErrorsMiddleware)
 
 
 @app.get("/health")
 async def health() -> JSONResponse:
     try:
-        await get_logics(app=app)
+        await get_game_context(app)
     except (ValueError, HSError) as ex:
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(ex)
         )
-    return JSONResponse(content="OK", status_code=status.HTTP_200_OK)
+    return JSONResponse(
+        content={
+            "status": "OK",
+            "next_day_prewarmed": app.state.game_contexts.is_prewarmed(),
+        },
+        status_code=status.HTTP_200_OK,
+    )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,233 @@
+from __future__ import annotations
+
+import abc
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import cache
+from typing import TYPE_CHECKING
+from typing import TypeVar
+
+from common import config
+from common.rate_limiter import take_token
+
+if TYPE_CHECKING:
+    from typing import Any
+    from typing import Callable
+
+T = TypeVar("T")
+
+
+class SharedBackend(abc.ABC):
+    """State shared by the workers serving the game.
+
+    Holds string values that expire, and token buckets for rate limiting
+    (see `RateLimiter`), under string keys.
+    """
+
+    @abc.abstractmethod
+    async def get(self, key: str) -> str | None: ...
+
+    @abc.abstractmethod
+    async def set(self, key: str, value: str, ttl: float) -> None: ...
+
+    @abc.abstractmethod
+    async def add(self, key: str, value: str, ttl: float) -> bool:
+        """Sets `key` unless it holds a value already, returning whether it did."""
+
+    @abc.abstractmethod
+    async def delete(self, key: str) -> None: ...
+
+    @abc.abstractmethod
+    async def is_limited(self, key: str, limit: int, period: float) -> bool:
+        """Takes a token from `key`'s bucket, refilled at `limit` per `period`."""
+
+
+class LocalBackend(SharedBackend):
+    """A stand-in kept in the memory of a single process."""
+
+    def __init__(
+        self, max_keys: int = 100_000, timer: Callable[[], float] = time.monotonic
+    ):
+        self.max_keys = max_keys
+        self.timer = timer
+        self._values: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    async def get(self, key: str) -> str | None:
+        entry = self._values.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= self.timer():
+            del self._values[key]
+            return None
+        return entry[1]
+
+    async def set(self, key: str, value: str, ttl: float) -> None:
+        self._values[key] = (self.timer() + ttl, value)
+        self._values.move_to_end(key)
+        if len(self._values) > self.max_keys:
+            self._values.popitem(last=False)
+
+    async def add(self, key: str, value: str, ttl: float) -> bool:
+        if await self.get(key) is not None:
+            return False
+        await self.set(key, value, ttl)
+        return True
+
+    async def delete(self, key: str) -> None:
+        self._values.pop(key, None)
+
+    async def is_limited(self, key: str, limit: int, period: float) -> bool:
+        is_limited, self._buckets[key] = take_token(
+            self._buckets.get(key), limit, period, self.timer()
+        )
+        self._buckets.move_to_end(key)
+        if len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return is_limited
+
+
+class SqliteBackend(SharedBackend):
+    """Shared by the workers of a host through an SQLite file.
+
+    Every process opens a connection of its own. Calls run in a thread, one
+    at a time per process, and writes are serialized by SQLite's lock. As
+    every rate limited request writes to the file, this suits development and
+    a single host with a few workers; without it, each worker keeps its own.
+    """
+
+    # expired values and buckets that have refilled are deleted once in a while
+    CLEANUP_EVERY = 10_000
+
+    def __init__(self, path: str, timer: Callable[[], float] = time.time):
+        self.path = path
+        self.timer = timer
+        self._lock = threading.Lock()
+        self._connection: sqlite3.Connection | None = None
+        self._pid: int | None = None
+        self._writes = 0
+
+    async def get(self, key: str) -> str | None:
+        return await asyncio.to_thread(self._run, self._get, key)
+
+    async def set(self, key: str, value: str, ttl: float) -> None:
+        await asyncio.to_thread(self._run, self._set, key, value, ttl)
+
+    async def add(self, key: str, value: str, ttl: float) -> bool:
+        return await asyncio.to_thread(self._run, self._add, key, value, ttl)
+
+    async def delete(self, key: str) -> None:
+        await asyncio.to_thread(self._run, self._delete, key)
+
+    async def is_limited(self, key: str, limit: int, period: float) -> bool:
+        return await asyncio.to_thread(self._run, self._is_limited, key, limit, period)
+
+    def _run(self, method: Callable[..., T], *args: Any) -> T:
+        with self._lock:
+            connection = self._connect()
+            result = method(connection, *args)
+            if self._writes >= self.CLEANUP_EVERY:
+                self._writes = 0
+                self._cleanup(connection)
+            return result
+
+    def _connect(self) -> sqlite3.Connection:
+        # a connection must not be used by a forked worker
+        if self._connection is None or self._pid != os.getpid():
+            self._connection = sqlite3.connect(
+                self.path, timeout=5, isolation_level=None, check_same_thread=False
+            )
+            self._pid = os.getpid()
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS shared_value "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS shared_bucket "
+                "(key TEXT PRIMARY KEY, tokens REAL NOT NULL, "
+                "updated_at REAL NOT NULL, refilled_at REAL NOT NULL)"
+            )
+        return self._connection
+
+    def _get(self, connection: sqlite3.Connection, key: str) -> str | None:
+        row = connection.execute(
+            "SELECT value FROM shared_value WHERE key = ? AND expires_at > ?",
+            (key, self.timer()),
+        ).fetchone()
+        return None if row is None else str(row[0])
+
+    def _set(
+        self, connection: sqlite3.Connection, key: str, value: str, ttl: float
+    ) -> None:
+        self._writes += 1
+        connection.execute(
+            "INSERT OR REPLACE INTO shared_value VALUES (?, ?, ?)",
+            (key, value, self.timer() + ttl),
+        )
+
+    def _add(
+        self, connection: sqlite3.Connection, key: str, value: str, ttl: float
+    ) -> bool:
+        self._writes += 1
+        now = self.timer()
+        # replaces only an expired value
+        cursor = connection.execute(
+            "INSERT INTO shared_value VALUES (?, ?, ?) ON CONFLICT (key) DO UPDATE "
+            "SET value = excluded.value, expires_at = excluded.expires_at "
+            "WHERE shared_value.expires_at <= ?",
+            (key, value, now + ttl, now),
+        )
+        return cursor.rowcount == 1
+
+    def _delete(self, connection: sqlite3.Connection, key: str) -> None:
+        connection.execute("DELETE FROM shared_value WHERE key = ?", (key,))
+
+    def _is_limited(
+        self, connection: sqlite3.Connection, key: str, limit: int, period: float
+    ) -> bool:
+        if limit < 1:
+            return True
+        self._writes += 1
+        # `take_token` in a single statement, so that the write lock is held only
+        # for the update. A limited request leaves the bucket as it is, which
+        # refills it the same. The bucket is full from `refilled_at` on, as good
+        # as a missing one.
+        refilled = "min(:limit, tokens + (:now - updated_at) * :limit / :period)"
+        cursor = connection.execute(
+            "INSERT INTO shared_bucket "
+            "VALUES (:key, :limit - 1, :now, :now + :period / :limit) "
+            "ON CONFLICT (key) DO UPDATE SET "
+            f"tokens = {refilled} - 1, updated_at = :now, "
+            f"refilled_at = :now + (:limit + 1 - {refilled}) * :period / :limit "
+            f"WHERE {refilled} >= 1",
+            {"key": key, "limit": limit, "period": period, "now": self.timer()},
+        )
+        return cursor.rowcount == 0
+
+    def _cleanup(self, connection: sqlite3.Connection) -> None:
+        now = self.timer()
+        connection.execute("DELETE FROM shared_value WHERE expires_at <= ?", (now,))
+        connection.execute("DELETE FROM shared_bucket WHERE refilled_at <= ?", (now,))
+
+
+@cache
+def get_shared_backend() -> SharedBackend | None:
+    """The backend set by `shared_backend`, if any.
+
+    `local` keeps the state in the process, `sqlite:///<path>` shares it
+    between the workers of a host.
+    """
+    url: str = getattr(config, "shared_backend", "")
+    if not url:
+        return None
+    if url == "local":
+        return LocalBackend()
+    if url.startswith("sqlite:///"):
+        return SqliteBackend(url.removeprefix("sqlite:///"))
+    raise ValueError(f"Unknown shared backend {url}")
@@ -0,0 +1,217 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import sys
+import time
+from collections import OrderedDict
+from functools import partial
+from typing import TYPE_CHECKING
+from typing import Generic
+from typing import Hashable
+from typing import TypeVar
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from typing import Any
+    from typing import Awaitable
+    from typing import Callable
+
+    from common.backend import SharedBackend
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+def sizeof(value: Any) -> int:
+    """Approximate bytes held by `value`, counting arrays and flat containers."""
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(sys.getsizeof(item) for item in value)
+    return sys.getsizeof(value)
+
+
+class LRUCache(Generic[K, V]):
+    """A least recently used cache bounded by entry count and approximate bytes.
+
+    Entries whose key is `pinned` are never evicted, even if the cache is over
+    its bounds as a result.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        maxbytes: int | None = None,
+        pinned: Callable[[K], bool] | None = None,
+    ):
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self.pinned = pinned
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict[K, tuple[int, V]] = OrderedDict()
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: K) -> V | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def set(self, key: K, value: V) -> None:
+        self.pop(key)
+        size = sizeof(value)
+        self._entries[key] = (size, value)
+        self.nbytes += size
+        self._evict()
+
+    def pop(self, key: K) -> V | None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return None
+        self.nbytes -= entry[0]
+        return entry[1]
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.nbytes = 0
+
+    def evict_where(self, predicate: Callable[[K], bool]) -> None:
+        for key in [key for key in self._entries if predicate(key)]:
+            self.pop(key)
+            self.evictions += 1
+
+    @property
+    def stats(self) -> dict[str, int]:
+        return {
+            "size": len(self._entries),
+            "bytes": self.nbytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def _is_full(self) -> bool:
+        if len(self._entries) > self.maxsize:
+            return True
+        return self.maxbytes is not None and self.nbytes > self.maxbytes
+
+    def _evict(self) -> None:
+        while self._is_full():
+            victim = next(
+                (
+                    key
+                    for key in self._entries
+                    if self.pinned is None or not self.pinned(key)
+                ),
+                None,
+            )
+            if victim is None:
+                return
+            self.pop(victim)
+            self.evictions += 1
+
+
+class AsyncTTLCache(Generic[K, V]):
+    """A size-bounded cache whose entries expire `ttl` seconds after loading.
+
+    Concurrent misses on the same key share a single call to the loader.
+    Loader errors and `None` results are returned to the callers but not cached.
+
+    With a shared `backend`, misses are looked up there under `name` before
+    calling the loader, so that a value is loaded once for all workers.
+    Values are stored there as `dumps` returns them.
+    """
+
+    def __init__(
+        self,
+        ttl: float,
+        maxsize: int,
+        timer: Callable[[], float] = time.monotonic,
+        backend: SharedBackend | None = None,
+        name: str = "",
+        dumps: Callable[[V], str] = json.dumps,
+        loads: Callable[[str], V] = json.loads,
+    ):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.timer = timer
+        self.backend = backend
+        self.name = name
+        self.dumps = dumps
+        self.loads = loads
+        self._entries: OrderedDict[K, tuple[float, V]] = OrderedDict()
+        self._loading: dict[K, asyncio.Future[V]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get(self, key: K, load: Callable[[], Awaitable[V]]) -> V:
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > self.timer():
+                self._entries.move_to_end(key)
+                return value
+            del self._entries[key]
+        loading = self._loading.get(key)
+        # e.g. test clients, each running the app in an event loop of its own
+        if loading is None or loading.get_loop() is not asyncio.get_running_loop():
+            if self.backend is not None:
+                load = partial(self._load_shared, key, load)
+            loading = asyncio.ensure_future(load())
+            self._loading[key] = loading
+            loading.add_done_callback(partial(self._loaded, key))
+        # a cancelled caller must not cancel the load other callers wait for
+        return await asyncio.shield(loading)
+
+    def set(self, key: K, value: V) -> None:
+        self._entries[key] = (self.timer() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    async def invalidate(self, key: K) -> None:
+        self._entries.pop(key, None)
+        # whatever is loading now may have read the old value
+        self._loading.pop(key, None)
+        if self.backend is not None:
+            await self.backend.delete(self._shared_key(key))
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._loading.clear()
+
+    def _shared_key(self, key: K) -> str:
+        return f"cache:{self.name}:{key}"
+
+    async def _load_shared(self, key: K, load: Callable[[], Awaitable[V]]) -> V:
+        assert self.backend is not None
+        if (dumped := await self.backend.get(self._shared_key(key))) is not None:
+            return self.loads(dumped)
+        value = await load()
+        if value is not None:
+            await self.backend.set(self._shared_key(key), self.dumps(value), self.ttl)
+        return value
+
+    def _loaded(self, key: K, loading: asyncio.Future[V]) -> None:
+        if self._loading.get(key) is not loading:
+            return
+        del self._loading[key]
+        if loading.cancelled() or loading.exception() is not None:
+            return
+        value = loading.result()
+        if value is not None:
+            self.set(key, value)
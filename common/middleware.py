@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+from fastapi import Request
+from fastapi import status
+from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp
+from starlette.types import Message
+from starlette.types import Receive
+from starlette.types import Scope
+from starlette.types import Send
+
+from common.error import HSError
+
+
+def get_idenitifier(request: Request) -> str:
+    forwarded = request.headers.get("X-Forwarded-For")
+    if forwarded:
+        return forwarded.split(",")[0].strip()
+    if request.client:
+        return request.client.host
+    else:
+        return "unknown"
+
+
+class RateLimitMiddleware:
+    """Answers 429 to clients over the budget of the requested path."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        request = Request(scope)
+        identifier = get_idenitifier(request)
+        if await request.app.state.rate_limiter.is_limited(
+            request.url.path, identifier
+        ):
+            response = JSONResponse(
+                content="", status_code=status.HTTP_429_TOO_MANY_REQUESTS
+            )
+            return await response(scope, receive, send)
+        await self.app(scope, receive, send)
+
+
+class KnownErrorsMiddleware:
+    """Answers 400 with the message of an `HSError` the app raised."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        response_started = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except HSError as e:
+            # too late to answer otherwise
+            if response_started:
+                raise
+            response = JSONResponse(
+                content=str(e), status_code=status.HTTP_400_BAD_REQUEST
+            )
+            await response(scope, receive, send)
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from typing import Callable
+    from typing import Hashable
+    from typing import Mapping
+
+    from common.backend import SharedBackend
+
+
+def take_token(
+    bucket: tuple[float, float] | None, limit: int, period: float, now: float
+) -> tuple[bool, tuple[float, float]]:
+    """Whether a request is limited, and the (tokens, now) bucket it leaves."""
+    if bucket is None:
+        tokens = float(limit)
+    else:
+        tokens = min(limit, bucket[0] + (now - bucket[1]) * limit / period)
+    is_limited = tokens < 1
+    if not is_limited:
+        tokens -= 1
+    return is_limited, (tokens, now)
+
+
+class RateLimiter:
+    """A token bucket per key, holding up to `limit` requests.
+
+    Buckets refill continuously at `limit` requests per `period` seconds and
+    are only refilled when their key makes a request, so every call is O(1).
+    At most `max_keys` buckets are tracked; the least recently used is dropped
+    to make room, which gives its key a full bucket should it come back.
+
+    With a shared `backend`, the buckets are kept there under `name` instead,
+    so that all workers share the budget.
+    """
+
+    def __init__(
+        self,
+        limit: int,
+        period: float,
+        max_keys: int = 100_000,
+        timer: Callable[[], float] = time.monotonic,
+        backend: SharedBackend | None = None,
+        name: str = "",
+    ):
+        self.limit = limit
+        self.period = period
+        self.max_keys = max_keys
+        self.timer = timer
+        self.backend = backend
+        self.name = name
+        self.evictions = 0
+        self._buckets: OrderedDict[Hashable, tuple[float, float]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    async def is_limited(self, key: Hashable) -> bool:
+        if self.backend is not None:
+            return await self.backend.is_limited(
+                f"limit:{self.name}:{key}", self.limit, self.period
+            )
+        return self.is_limited_locally(key)
+
+    def is_limited_locally(self, key: Hashable) -> bool:
+        is_limited, self._buckets[key] = take_token(
+            self._buckets.get(key), self.limit, self.period, self.timer()
+        )
+        self._buckets.move_to_end(key)
+        if len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+            self.evictions += 1
+        return is_limited
+
+
+class RouteRateLimiter:
+    """Rate limits requests by the longest configured prefix of their path.
+
+    Each prefix has a budget of its own; other paths share the default one.
+    """
+
+    def __init__(
+        self,
+        default: RateLimiter,
+        routes: Mapping[str, RateLimiter] | None = None,
+    ):
+        self.default = default
+        # longest first, so that the most specific prefix matches
+        self.routes = sorted(
+            (routes or {}).items(), key=lambda route: len(route[0]), reverse=True
+        )
+
+    def get_limiter(self, path: str) -> RateLimiter:
+        for prefix, limiter in self.routes:
+            if path.startswith(prefix):
+                return limiter
+        return self.default
+
+    async def is_limited(self, path: str, key: Hashable) -> bool:
+        return await self.get_limiter(path).is_limited(key)
@@ -1,41 +1,91 @@
 from __future__ import annotations
 
-from contextlib import contextmanager
+import os
+from contextlib import asynccontextmanager
+from functools import cache
 from typing import TYPE_CHECKING
 
 import gensim.models.keyedvectors as word2vec
-from sqlmodel import Session
-from sqlmodel import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from common import config
 from model import GensimModel
 
 if TYPE_CHECKING:
-    from typing import Iterator
+    from typing import Any
+    from typing import AsyncIterator
+
+    from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+MODEL_PATH = "model.mdl"
+FLAT_VECTORS_PATH = "model.npy"
+FLAT_VOCAB_PATH = "model.vocab"
+
+ASYNC_DRIVERS = {
+    "postgresql": "asyncpg",
+    "sqlite": "aiosqlite",
+    "mssql": "aioodbc",
+}
 
 
 def get_model() -> GensimModel:
-    return GensimModel(word2vec.KeyedVectors.load("model.mdl").wv)
+    if os.path.exists(FLAT_VECTORS_PATH) and os.path.exists(FLAT_VOCAB_PATH):
+        return GensimModel.from_flat(FLAT_VECTORS_PATH, FLAT_VOCAB_PATH)
+    return get_pickled_model()
+
+
+def get_pickled_model(path: str = MODEL_PATH) -> GensimModel:
+    return GensimModel(word2vec.KeyedVectors.load(path).wv)
+
+
+def get_async_db_url() -> str:
+    """`async_db_url` if configured, otherwise `db_url` with its async driver."""
+    async_db_url: str | None = getattr(config, "async_db_url", None)
+    if async_db_url:
+        return async_db_url
+    url = make_url(config.db_url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver for {backend}, set async_db_url")
+    url = url.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}")
+    return url.render_as_string(hide_password=False)
+
+
+@cache
+def get_engine() -> AsyncEngine:
+    pool_kwargs: dict[str, Any] = {
+        "pool_pre_ping": getattr(config, "db_pool_pre_ping", True),
+        "pool_recycle": getattr(config, "db_pool_recycle", 1800),
+    }
+    if not config.db_url.startswith("sqlite"):
+        pool_kwargs["pool_size"] = getattr(config, "db_pool_size", 10)
+        pool_kwargs["max_overflow"] = getattr(config, "db_max_overflow", 20)
+    engine = create_async_engine(get_async_db_url(), **pool_kwargs)
+    # pooled connections must not be shared with forked workers
+    os.register_at_fork(after_in_child=lambda: engine.sync_engine.dispose(close=False))
+    return engine
 
 
-def get_session() -> Session:
-    engine = create_engine(config.db_url)
-    return Session(engine)
+def get_session() -> AsyncSession:
+    return AsyncSession(get_engine())
 
 
-@contextmanager
-def hs_transaction(
-    session: Session, expire_on_commit: bool = True
-) -> Iterator[Session]:
+@asynccontextmanager
+async def hs_transaction(
+    session: AsyncSession, expire_on_commit: bool = True
+) -> AsyncIterator[AsyncSession]:
     try:
         if not expire_on_commit:
-            session.expire_on_commit = False
-        session.begin()
+            session.sync_session.expire_on_commit = False
+        await session.begin()
         yield session
-        session.commit()
+        await session.commit()
     except Exception:
-        session.rollback()
+        await session.rollback()
         raise
     finally:
-        session.expire_on_commit = True
-        session.close()
+        session.sync_session.expire_on_commit = True
+        await session.close()
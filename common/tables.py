@@ -2,6 +2,7 @@ import datetime
 
 from sqlalchemy import Index
 from sqlalchemy import String
+from sqlalchemy import Text
 from sqlalchemy import UniqueConstraint
 from sqlmodel import Field
 from sqlmodel import Relationship
@@ -19,7 +20,8 @@ class User(SQLModel, table=True):
     first_login: datetime.datetime = Field(
         default_factory=lambda: datetime.datetime.now(datetime.UTC)
     )
-    # subscription_expiry: datetime.datetime | None = None
+    # UTC, extended by every subscription, see UserLogic.subscribe
+    subscription_expiry: datetime.datetime | None = None
     subscriptions: "UserSubscription" = Relationship()
 
 
@@ -44,6 +46,23 @@ class UserHistory(SQLModel, table=True):
     solver_count: int | None = None
 
 
+class UserStats(SQLModel, table=True):
+    """Statistics of a user's games, kept up to date as guesses are saved."""
+
+    id: int = Field(default=None, primary_key=True)
+    user_id: int = Field(foreign_key="user.id", unique=True)
+    games_played: int = 0
+    games_won: int = 0
+    # sum of the guess numbers of winning guesses
+    total_guesses_to_win: int = 0
+    best_rank: int | None = None
+    # consecutive days played up to `last_game_date`
+    current_streak: int = 0
+    longest_streak: int = 0
+    last_game_date: datetime.date | None = None
+    last_won_date: datetime.date | None = None
+
+
 class UserClueCount(SQLModel, table=True):
     __table_args__ = (UniqueConstraint("user_id", "game_date"),)
 
@@ -59,11 +78,23 @@ class SecretWord(SQLModel, table=True):
     id: int = Field(default=None, primary_key=True)
     word: str = Field(String(32), unique=True)
     game_date: datetime.date
+    # no longer counted since SolverCounter, see solver_reserved
     solver_count: int = 0
+    # the highest solver rank reserved by any process, see SolverCounter
+    solver_reserved: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
+    # the closest 1000 words, newline separated, from 1/1000 to the secret itself
+    closest_words: str | None = Field(default=None, sa_type=Text)
 
     closest1000: list["Closest1000"] = Relationship()
 
 
+class SecretChange(SQLModel, table=True):
+    """A secret set or rewritten, whose cached copies the workers must drop."""
+
+    id: int = Field(default=None, primary_key=True)
+    game_date: datetime.date
+
+
 class UserSubscription(SQLModel, table=True):
     id: int = Field(default=None, primary_key=True)
     user_id: int = Field(foreign_key="user.id")
@@ -84,6 +115,7 @@ class HotClue(SQLModel, table=True):
 
 
 class Closest1000(SQLModel, table=True):
+    # neither written nor read since SecretWord.closest_words, left to be dropped
     __tableargs__ = (UniqueConstraint("secret_word_id", "out_of_1000"),)
 
     id: int = Field(default=None, primary_key=True)
@@ -1,3 +1,5 @@
 import numpy.typing
 
 np_float_arr = numpy.typing.NDArray[numpy.float32]
+np_float64_arr = numpy.typing.NDArray[numpy.float64]
+np_int_arr = numpy.typing.NDArray[numpy.int16]
@@ -2,6 +2,8 @@
 from __future__ import annotations
 
 import datetime
+import hashlib
+import time
 from typing import TYPE_CHECKING
 
 import jwt
@@ -9,21 +11,110 @@ from google.auth.transport import requests
 from google.oauth2 import id_token
 
 from common import config
+from common.backend import LocalBackend
+from common.backend import get_shared_backend
+from common.cache import LRUCache
 from logic.user_logic import UserLogic
 
 if TYPE_CHECKING:
     from typing import Any
+    from typing import Callable
 
-    from sqlmodel import Session
+    from sqlmodel.ext.asyncio.session import AsyncSession
+
+    from common.backend import SharedBackend
 
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24 * 30  # 30 days
 
 
+class TokenCache:
+    """Claims of verified access tokens, by the digest of the token.
+
+    A token is verified again once its entry expires, `ttl` seconds after it
+    was verified or when the token itself does, whichever is sooner.
+    Revoked tokens are listed in the `backend` until they expire, and fail
+    verification from then on. Workers that cached such a token before it
+    was revoked keep accepting it for up to `ttl` seconds, and workers that do
+    not share the `backend` until it expires.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 4096,
+        ttl: float = 5 * 60,
+        backend: SharedBackend | None = None,
+        timer: Callable[[], float] = time.time,
+    ):
+        self.ttl = ttl
+        self.timer = timer
+        self.backend = backend if backend is not None else LocalBackend()
+        self._claims: LRUCache[str, tuple[float, dict[str, Any]]] = LRUCache(
+            maxsize=maxsize
+        )
+
+    async def decode(self, token: str) -> dict[str, Any] | None:
+        """The claims of `token`, or None if it expired or was revoked."""
+        digest = self._digest(token)
+        entry = self._claims.get(digest)
+        if entry is not None and entry[0] > self.timer():
+            return entry[1]
+        self._claims.pop(digest)
+        try:
+            claims = self._verify(token)
+        except jwt.exceptions.ExpiredSignatureError:
+            return None
+        if await self.backend.get(self._revoked_key(digest)) is not None:
+            return None
+        expires_at = min(self.timer() + self.ttl, claims.get("exp", float("inf")))
+        self._claims.set(digest, (expires_at, claims))
+        return claims
+
+    async def revoke(self, token: str) -> None:
+        digest = self._digest(token)
+        self._claims.pop(digest)
+        try:
+            claims = self._verify(token)
+        except jwt.exceptions.InvalidTokenError:
+            # accepted by no one anyway
+            return
+        if (ttl := claims.get("exp", float("inf")) - self.timer()) > 0:
+            await self.backend.set(self._revoked_key(digest), "", ttl)
+
+    @staticmethod
+    def _verify(token: str) -> dict[str, Any]:
+        claims: dict[str, Any] = jwt.decode(
+            token, config.jwt_key, algorithms=[config.jwt_algorithm]
+        )
+        return claims
+
+    @staticmethod
+    def _digest(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    @staticmethod
+    def _revoked_key(digest: str) -> str:
+        return f"revoked:{digest}"
+
+
 class AuthLogic:
-    def __init__(self, session: Session, auth_client_id: str) -> None:
+    _tokens = TokenCache(
+        maxsize=getattr(config, "token_cache_size", 4096),
+        ttl=getattr(config, "token_cache_ttl", 5 * 60),
+        backend=get_shared_backend(),
+    )
+
+    def __init__(self, session: AsyncSession, auth_client_id: str) -> None:
         self.user_logic = UserLogic(session)
         self.auth_client_id = auth_client_id
 
+    @classmethod
+    async def decode_token(cls, token: str) -> dict[str, Any] | None:
+        return await cls._tokens.decode(token)
+
+    @classmethod
+    async def revoke_token(cls, token: str) -> None:
+        await cls._tokens.revoke(token)
+
     async def jwt_from_credential(self, credential: str) -> str:
         user_info = self._verify_credential(credential)
         email = user_info["email"]
@@ -1,62 +1,115 @@
 from __future__ import annotations
 
+import asyncio
 import datetime
-import heapq
-from functools import lru_cache
+import uuid
+from dataclasses import dataclass
+from functools import partial
 from typing import TYPE_CHECKING
 from typing import no_type_check
 
+import numpy as np
+from sqlalchemy import delete
+from sqlalchemy import func
+from sqlalchemy import insert
+from sqlmodel import col
 from sqlmodel import select
 from sqlmodel import update
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from common import config
 from common import tables
+from common.backend import LocalBackend
+from common.backend import get_shared_backend
+from common.cache import AsyncTTLCache
+from common.cache import LRUCache
 from common.error import HSError
+from common.logger import logger
 from common.session import hs_transaction
+from common.typing import np_float64_arr
 from common.typing import np_float_arr
+from common.typing import np_int_arr
 
 if TYPE_CHECKING:
     from typing import AsyncIterator
+    from typing import Awaitable
+    from typing import Callable
 
-    from sqlmodel import Session
+    from sqlalchemy.ext.asyncio import AsyncEngine
 
+    from common.backend import SharedBackend
     from model import GensimModel
 
 
+def is_current_date(date: str, days_delta: datetime.timedelta | None = None) -> bool:
+    """Whether the cached entries of `date` must survive eviction.
+
+    Those of the served date, today (UTC) less `days_delta`, must, as must those
+    of the day before, whose secret is revealed, and of the prewarmed day after.
+    """
+    today = datetime.datetime.now(datetime.UTC).date() - (
+        days_delta or datetime.timedelta()
+    )
+    return date in {str(today + datetime.timedelta(days=days)) for days in (-1, 0, 1)}
+
+
 class SecretLogic:
-    def __init__(self, session: Session, dt: datetime.date | None = None):
+    _secrets: AsyncTTLCache[datetime.date, str] = AsyncTTLCache(
+        ttl=24 * 60 * 60, maxsize=2048, backend=get_shared_backend(), name="secret"
+    )
+
+    def __init__(self, session: AsyncSession, dt: datetime.date | None = None):
         if dt is None:
             dt = datetime.datetime.now(datetime.UTC).date()
         self.date = dt
         self.session = session
 
-    async def get_secret(self) -> str:
-        return self._get_cached_secret(session=self.session, date=self.date)
+    @classmethod
+    async def invalidate(cls, date: datetime.date) -> None:
+        await cls._secrets.invalidate(date)
 
-    @staticmethod
-    @lru_cache(maxsize=2048)
-    def _get_cached_secret(session: Session, date: datetime.date) -> str:
-        # TODO: this function is accessing db but is NOT ASYNC, which might be
-        # problematic if we choose to do async stuff with sql in the future.
-        # the reason for that is `@lru_cache` does not support async.
-        query = select(tables.SecretWord)
-        query = query.where(tables.SecretWord.game_date == date)
+    async def get_secret(self) -> str:
+        return await self._secrets.get(self.date, self._get_secret)
 
-        with hs_transaction(session) as session:
-            secret_word = session.exec(query).one_or_none()
-            if secret_word is not None:
-                return secret_word.word
-            else:
-                raise HSError("No secret found!", code=250722)
+    async def _get_secret(self) -> str:
+        # a session of its own, as the callers of a shared load may leave early
+        query = select(tables.SecretWord.word)
+        query = query.where(tables.SecretWord.game_date == self.date)
+        async with hs_transaction(AsyncSession(self.session.bind)) as session:
+            secret: str | None = (await session.exec(query)).one_or_none()
+        if secret is None:
+            raise HSError("No secret found!", code=250722)
+        return secret
 
     async def set_secret(self, secret: str, clues: list[str]) -> None:
-        with hs_transaction(self.session, expire_on_commit=False) as session:
-            db_secret = tables.SecretWord(word=secret, game_date=self.date)
+        query = select(tables.SecretWord)
+        query = query.where(tables.SecretWord.game_date == self.date)
+        async with hs_transaction(self.session, expire_on_commit=False) as session:
+            db_secret = (await session.exec(query)).one_or_none()
+            if db_secret is None:
+                db_secret = tables.SecretWord(word=secret, game_date=self.date)
+            else:
+                # a rewrite, whose clues and closest words are replaced as well
+                db_secret.word = secret
+                db_secret.closest_words = None
+                connection = await session.connection()
+                await connection.execute(
+                    delete(tables.HotClue).where(
+                        col(tables.HotClue.secret_word_id) == db_secret.id
+                    )
+                )
             session.add(db_secret)
-        with hs_transaction(self.session) as session:
+        async with hs_transaction(self.session) as session:
             for clue in clues:
                 if clue:
                     session.add(tables.HotClue(secret_word_id=db_secret.id, clue=clue))
+        await self.invalidate(self.date)
+
+    async def get_hot_clues(self) -> list[str]:
+        query = select(tables.HotClue.clue).join(tables.SecretWord)
+        query = query.where(tables.SecretWord.game_date == self.date)
+        async with hs_transaction(self.session) as session:
+            return list((await session.exec(query)).all())
 
     async def get_all_secrets(
         self, with_future: bool
@@ -64,8 +117,8 @@ class SecretLogic:
         query = select(tables.SecretWord)
         if not with_future:
             query = query.where(tables.SecretWord.game_date < self.date)
-        with hs_transaction(self.session) as session:
-            secrets = session.exec(query)
+        async with hs_transaction(self.session) as session:
+            secrets = await session.exec(query)
             return [(secret.word, str(secret.game_date)) for secret in secrets]
 
     @no_type_check
@@ -73,18 +126,126 @@ class SecretLogic:
         # UPDATE RETURNING is not fully supported by sqlmodel typing yet
         query = update(tables.SecretWord)
         query = query.where(tables.SecretWord.game_date == self.date)
-        query = query.values(solver_count=tables.SecretWord.solver_count + 1)
-        query = query.returning(tables.SecretWord.solver_count)
-
-        with hs_transaction(self.session) as session:
-            solver_count = session.exec(query).scalar_one()
+        query = query.values(
+            solver_count=tables.SecretWord.solver_count + 1,
+            solver_reserved=tables.SecretWord.solver_reserved + 1,
+        )
+        query = query.returning(tables.SecretWord.solver_reserved)
+
+        async with hs_transaction(self.session) as session:
+            solver_count = (await session.execute(query)).scalar_one()
             return solver_count
 
+    @no_type_check
+    async def reserve_solver_ranks(self, amount: int) -> int:
+        """Reserves the next `amount` solver ranks, returning the last of them."""
+        query = update(tables.SecretWord)
+        query = query.where(tables.SecretWord.game_date == self.date)
+        query = query.values(solver_reserved=tables.SecretWord.solver_reserved + amount)
+        query = query.returning(tables.SecretWord.solver_reserved)
+
+        async with hs_transaction(self.session) as session:
+            connection = await session.connection()
+            return (await connection.execute(query)).scalar_one()
+
+
+class SolverCounter:
+    """Hands out solver ranks from blocks reserved in the DB.
+
+    Each process reserves `block_size` ranks at a time by bumping
+    `SecretWord.solver_reserved`, so the secret's row is locked once per block
+    rather than once per solve. Ranks are unique per day and increase within a
+    process, but are not ordered across processes: a process may hand out the
+    rest of an early block after another has moved on to a later one.
+
+    `solver_reserved` only grows and is bumped before any of a block is handed
+    out, so no rank is given twice, even after a crash. The unused part of the
+    blocks of a process that stops is skipped.
+    """
+
+    def __init__(self, engine: AsyncEngine, block_size: int = 10):
+        self.engine = engine
+        self.block_size = block_size
+        # per date, the next rank to hand out and the end of the block
+        self._blocks: dict[datetime.date, tuple[int, int]] = {}
+        self._lock = asyncio.Lock()
+
+    async def get_rank(self, date: datetime.date) -> int:
+        async with self._lock:
+            rank, end = self._blocks.get(date, (0, 0))
+            if rank >= end:
+                async with AsyncSession(self.engine) as session:
+                    last = await SecretLogic(session, dt=date).reserve_solver_ranks(
+                        self.block_size
+                    )
+                rank, end = last - self.block_size + 1, last + 1
+                # blocks of past games are no longer needed
+                for old in [old for old in self._blocks if old < date]:
+                    del self._blocks[old]
+            self._blocks[date] = (rank + 1, end)
+            return rank
+
+
+class SecretChanges:
+    """Tells the caches of a worker about secrets set or rewritten by any process.
+
+    `CacheSecretLogic.do_populate` records a `SecretChange` once the secret of
+    its date is fully written. Every `poll_interval` seconds, `run` passes the
+    dates of the changes recorded since its previous poll to the subscribers,
+    so that cached copies can be kept for long and dropped a date at a time.
+    """
+
+    def __init__(self, engine: AsyncEngine, poll_interval: float = 5.0):
+        self.engine = engine
+        self.poll_interval = poll_interval
+        self._subscribers: list[Callable[[datetime.date], Awaitable[None]]] = []
+        self._last_id: int | None = None
+
+    def subscribe(self, callback: Callable[[datetime.date], Awaitable[None]]) -> None:
+        self._subscribers.append(callback)
+
+    async def run(self) -> None:
+        while True:
+            try:
+                await self.poll()
+            except Exception:
+                logger.exception("Could not poll secret changes, will retry")
+            await asyncio.sleep(self.poll_interval)
+
+    async def poll(self) -> list[datetime.date]:
+        async with hs_transaction(AsyncSession(self.engine)) as session:
+            if self._last_id is None:
+                # nothing is cached yet of what changed before the first poll
+                last_id = select(func.max(tables.SecretChange.id))
+                self._last_id = (await session.exec(last_id)).one() or 0
+                return []
+            query = select(
+                col(tables.SecretChange.id), col(tables.SecretChange.game_date)
+            )
+            query = query.where(col(tables.SecretChange.id) > self._last_id)
+            changes = (await session.exec(query)).all()
+        if not changes:
+            return []
+        dates = sorted({date for _, date in changes})
+        for date in dates:
+            logger.info(f"Secret of {date} changed, invalidating its caches")
+            for callback in self._subscribers:
+                await callback(date)
+        # only now, so that a failed invalidation is retried on the next poll
+        self._last_id = max(change_id for change_id, _ in changes)
+        return dates
+
 
 class VectorLogic:
-    _secret_cache: dict[str, np_float_arr] = {}
+    _secret_cache: LRUCache[str, np_float_arr] = LRUCache(
+        maxsize=256, maxbytes=16 * 2**20, pinned=is_current_date
+    )
 
-    def __init__(self, session: Session, model: GensimModel, dt: datetime.date):
+    @classmethod
+    async def invalidate(cls, date: datetime.date) -> None:
+        cls._secret_cache.pop(str(date))
+
+    def __init__(self, session: AsyncSession, model: GensimModel, dt: datetime.date):
         self.model = model
         self.session = session
         self.date = str(dt)
@@ -97,14 +258,19 @@ class VectorLogic:
         secret_vector = await self.get_secret_vector()
         return await self.model.get_similarities(words, secret_vector)
 
+    async def get_all_similarities(self) -> np_float64_arr:
+        secret_vector = await self.get_secret_vector()
+        return await self.model.get_all_similarities(secret_vector)
+
     async def get_secret_vector(self) -> np_float_arr:
-        if self._secret_cache.get(self.date) is None:
+        vector = self._secret_cache.get(self.date)
+        if vector is None:
             secret = await self.secret_logic.get_secret()
             vector = await self.get_vector(secret)
             if vector is None:
                 raise ValueError("No secret found!")  # TODO: better exception
-            self._secret_cache[self.date] = vector
-        return self._secret_cache[self.date]
+            self._secret_cache.set(self.date, vector)
+        return vector
 
     async def get_similarity(self, word: str) -> float:
         word_vector = await self.get_vector(word)
@@ -124,14 +290,57 @@ class VectorLogic:
         return self.model.iterate_all()
 
 
+class GameTable:
+    """Similarity and closest-1000 rank of every model word for a single date.
+
+    The similarities are those of `GensimModel.get_all_similarities`, which may
+    differ from `VectorLogic.get_similarity` by 0.01.
+    """
+
+    def __init__(
+        self, model: GensimModel, similarities: np_float64_arr, closest1000: list[str]
+    ):
+        self.model = model
+        self.similarities = similarities
+        self.ranks: np_int_arr = np.full(len(similarities), -1, dtype=np.int16)
+        for out_of, word in enumerate(closest1000, start=1):
+            index = model.get_index(word)
+            if index is not None:
+                self.ranks[index] = out_of
+
+    def get_scores(self, word: str) -> tuple[float, int]:
+        index = self.model.get_index(word)
+        if index is None:
+            raise HSError("Word not found", code=100796)
+        return round(float(self.similarities[index]), 2), int(self.ranks[index])
+
+    def get_similarity(self, word: str) -> float:
+        return self.get_scores(word)[0]
+
+    def get_cache_score(self, word: str) -> int:
+        index = self.model.get_index(word)
+        if index is None:
+            return -1
+        return int(self.ranks[index])
+
+    def __sizeof__(self) -> int:
+        return object.__sizeof__(self) + self.similarities.nbytes + self.ranks.nbytes
+
+
 class CacheSecretLogic:
     _secret_cache_key_fmt = "hs:{}:{}"
-    _cache_dict: dict[str, list[str]] = {}
     MAX_CACHE = 50
+    MAX_GAME_TABLES = 3
+    _cache_dict: LRUCache[str, list[str]] = LRUCache(
+        maxsize=MAX_CACHE, maxbytes=16 * 2**20, pinned=is_current_date
+    )
+    _game_tables: LRUCache[str, GameTable] = LRUCache(
+        maxsize=MAX_GAME_TABLES, maxbytes=64 * 2**20, pinned=is_current_date
+    )
 
     def __init__(
         self,
-        session: Session,
+        session: AsyncSession,
         secret: str,
         dt: datetime.date,
         model: GensimModel,
@@ -142,14 +351,16 @@ class CacheSecretLogic:
         self.date_ = dt
         self.date = str(dt)
         self.vector_logic = VectorLogic(self.session, model=model, dt=dt)
+        self.gensim_model = model
         self.secret = secret
         self._secret_cache_key: str | None = None
         self.model = model.model
-        self.words = self.model.key_to_index.keys()
         self.session = session
 
-    def _iterate_all_wv(self) -> AsyncIterator[tuple[str, np_float_arr]]:
-        return self.vector_logic.iterate_all()
+    @classmethod
+    async def invalidate(cls, date: datetime.date) -> None:
+        cls._cache_dict.pop(str(date))
+        cls._game_tables.pop(str(date))
 
     async def simulate_set_secret(self, force: bool = False) -> None:
         """Simulates setting a secret, but does not actually do it.
@@ -164,23 +375,19 @@ class CacheSecretLogic:
 
             query = select(tables.SecretWord.game_date)  # type: ignore
             query = query.where(tables.SecretWord.word == self.secret)
-            with hs_transaction(self.session) as session:
-                date = session.exec(query).one_or_none()
+            async with hs_transaction(self.session) as session:
+                date = (await session.exec(query)).one_or_none()
             if date is not None:
                 raise ValueError(f"This word was a secret on {date}")
-            if self.secret not in self.words:
+            if self.gensim_model.get_index(self.secret) is None:
                 raise ValueError("This word is not in the model")
 
         secret_vec = self.model[self.secret]
 
-        nearest: list[tuple[float, str]] = []
-        async for word, vec in self._iterate_all_wv():
-            s = await self.vector_logic.calc_similarity(vec, secret_vec)
-            heapq.heappush(nearest, (s, word))
-            if len(nearest) > 1000:
-                heapq.heappop(nearest)
-        nearest.sort()
-        self._cache_dict[self.date] = [w[1] for w in nearest]
+        self._cache_dict.set(
+            self.date, await self.gensim_model.get_closest(secret_vec, topn=1000)
+        )
+        self._game_tables.pop(self.date)
 
     async def do_populate(self, clues: list[str]) -> None:
         # expiration = (  # TODO: implement this for SQL
@@ -188,46 +395,219 @@ class CacheSecretLogic:
         #     - datetime.datetime.now(datetime.UTC).date()
         #     + datetime.timedelta(days=4)
         # )
+        closest1000 = self._cache_dict.get(self.date)
+        if closest1000 is None:
+            raise ValueError("Call simulate_set_secret() first")
         await self.vector_logic.secret_logic.set_secret(self.secret, clues)
-        closest1000 = []
-        for out_of, word in enumerate(self._cache_dict[self.date], start=1):
-            closest1000.append(tables.Closest1000(word=word, out_of_1000=out_of))
-        with hs_transaction(self.session) as session:
-            secret_word = select(tables.SecretWord).where(
-                tables.SecretWord.game_date == self.date,
-                tables.SecretWord.word == self.secret,
+        self.vector_logic._secret_cache.pop(self.date)
+        query = select(tables.SecretWord.id).where(
+            tables.SecretWord.game_date == self.date_,
+            tables.SecretWord.word == self.secret,
+        )
+        async with hs_transaction(self.session) as session:
+            secret_word_id = (await session.exec(query)).one()
+            connection = await session.connection()
+            await connection.execute(
+                update(tables.SecretWord)
+                .where(col(tables.SecretWord.id) == secret_word_id)
+                .values(closest_words="\n".join(closest1000))
+            )
+            await connection.execute(
+                insert(tables.SecretChange).values(game_date=self.date_)
             )
-            secret_word = session.execute(secret_word).scalar_one()
-            secret_word.closest1000 = closest1000  # type: ignore
-            session.add(secret_word)
 
     async def get_cache(self) -> list[str]:
         cache = self._cache_dict.get(self.date)
         if cache is None or len(cache) < 1000:
-            if len(self._cache_dict) > self.MAX_CACHE:
-                self._cache_dict.clear()
-            with hs_transaction(self.session) as session:
-                query = select(tables.SecretWord).where(
-                    tables.SecretWord.game_date == self.date,
-                    tables.SecretWord.word == self.secret,
-                )
-                secret_word = session.exec(query).one()
-                if secret_word is None:
-                    raise HSError("Secret not found", code=100796)
-                cached = [
-                    closest.word
-                    for closest in sorted(
-                        secret_word.closest1000, key=lambda c: c.out_of_1000
-                    )
-                ]
-            self._cache_dict[self.date] = cached
-        return self._cache_dict[self.date]
+            query = select(tables.SecretWord.closest_words)
+            query = query.where(
+                tables.SecretWord.game_date == self.date_,
+                tables.SecretWord.word == self.secret,
+            )
+            async with hs_transaction(self.session) as session:
+                closest_words = (await session.exec(query)).one_or_none()
+            if not closest_words:
+                raise HSError("Secret not found", code=100796)
+            cache = closest_words.split("\n")
+            self._cache_dict.set(self.date, cache)
+        return cache
+
+    async def get_game_table(self) -> GameTable:
+        game_table = self._game_tables.get(self.date)
+        if game_table is None:
+            game_table = GameTable(
+                model=self.gensim_model,
+                similarities=await self.vector_logic.get_all_similarities(),
+                closest1000=await self.get_cache(),
+            )
+            self._game_tables.set(self.date, game_table)
+        return game_table
 
     async def get_cache_score(self, word: str) -> int:
+        return (await self.get_game_table()).get_cache_score(word)
+
+
+@dataclass(frozen=True, eq=False)
+class GameContext:
+    """Everything requests need to know about the game of a single date."""
+
+    date: datetime.date
+    secret: str
+    secret_vector: np_float_arr
+    closest1000: tuple[str, ...]
+    game_table: GameTable
+    hot_clues: tuple[str, ...]
+
+    @classmethod
+    async def build(
+        cls, session: AsyncSession, model: GensimModel, dt: datetime.date
+    ) -> GameContext:
+        vector_logic = VectorLogic(session, model=model, dt=dt)
+        secret = await vector_logic.secret_logic.get_secret()
+        cache_logic = CacheSecretLogic(session, secret=secret, dt=dt, model=model)
+        return cls(
+            date=dt,
+            secret=secret,
+            secret_vector=await vector_logic.get_secret_vector(),
+            closest1000=tuple(await cache_logic.get_cache()),
+            game_table=await cache_logic.get_game_table(),
+            hot_clues=tuple(await vector_logic.secret_logic.get_hot_clues()),
+        )
+
+
+class GameContextLogic:
+    """Publishes the GameContext of the current date.
+
+    The context is built once per date by a single request, and replaces the
+    previous one on the first request after UTC midnight. `run_prewarmer` builds
+    the next date's context ahead of time and switches to it at midnight.
+
+    Only the worker whose prewarmer claims the next date in the shared
+    `backend` prewarms it and alerts when it cannot; the other workers build
+    their context as the date starts. A claim not renewed within
+    `PREWARM_LEASE` seconds, as by a worker that stopped, is taken over.
+    """
+
+    PREWARM_RETRY = 15 * 60
+    PREWARM_LEASE = 2 * PREWARM_RETRY
+
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        model: GensimModel,
+        days_delta: datetime.timedelta = datetime.timedelta(),
+        backend: SharedBackend | None = None,
+    ):
+        self.engine = engine
+        self.model = model
+        self.days_delta = days_delta
+        self.backend = backend if backend is not None else LocalBackend()
+        self._prewarmer_id = uuid.uuid4().hex
+        self.current: GameContext | None = None
+        self.prewarmed: datetime.date | None = None
+        self._contexts: AsyncTTLCache[datetime.date, GameContext] = AsyncTTLCache(
+            ttl=3 * 24 * 60 * 60, maxsize=2
+        )
+        # the caches the contexts are built from keep the dates served
+        for cache in (
+            VectorLogic._secret_cache,
+            CacheSecretLogic._cache_dict,
+            CacheSecretLogic._game_tables,
+        ):
+            cache.pinned = partial(is_current_date, days_delta=days_delta)
+
+    def get_date(self) -> datetime.date:
+        return datetime.datetime.now(datetime.UTC).date() - self.days_delta
+
+    def get_next_date(self) -> datetime.date:
+        return self.get_date() + datetime.timedelta(days=1)
+
+    def is_prewarmed(self) -> bool:
+        return self.prewarmed == self.get_next_date()
+
+    async def get_context(self) -> GameContext:
+        date = self.get_date()
+        current = self.current
+        if current is None or current.date != date:
+            current = await self._contexts.get(date, partial(self._build, date))
+            if self.current is not current:
+                self.current = current
+                logger.info(f"Switched game context to {date}")
+        return current
+
+    async def invalidate(self, date: datetime.date) -> None:
+        await self._contexts.invalidate(date)
+        if self.prewarmed == date:
+            self.prewarmed = None
+        if self.current is not None and self.current.date == date:
+            self.current = None
+
+    async def prewarm(self) -> GameContext:
+        date = self.get_next_date()
+        context = await self._contexts.get(date, partial(self._build, date))
+        if len(context.closest1000) < 1000:
+            await self._contexts.invalidate(date)
+            raise HSError(
+                f"Only {len(context.closest1000)} closest words on {date}", code=311024
+            )
+        self.prewarmed = date
+        return context
+
+    async def run_prewarmer(self, alert: Callable[[str], Awaitable[None]]) -> None:
+        alerted: datetime.date | None = None
+        while True:
+            date = self.get_next_date()
+            if not self.is_prewarmed() and await self._claim_prewarm(date):
+                try:
+                    await self.prewarm()
+                    logger.info(f"Prewarmed game context of {date}")
+                    # for good, so that no other worker prewarms the date
+                    await self._claim_prewarm(date, ttl=2 * 24 * 60 * 60)
+                except Exception as ex:
+                    logger.exception(f"Could not prewarm game context of {date}")
+                    if alerted != date:
+                        alerted = date
+                        # a failed alert must not stop the prewarmer for good
+                        try:
+                            await alert(f"Could not prepare the game of {date}: {ex}")
+                        except Exception:
+                            logger.exception(f"Could not alert about {date}")
+
+            now = datetime.datetime.now(datetime.UTC)
+            midnight = datetime.datetime.combine(
+                now.date() + datetime.timedelta(days=1), datetime.time(), datetime.UTC
+            )
+            delay = (midnight - now).total_seconds()
+            if not self.is_prewarmed():
+                delay = min(delay, self.PREWARM_RETRY)
+            await asyncio.sleep(delay)
+            if self.get_date() == date:
+                try:
+                    await self.get_context()
+                except Exception:
+                    logger.exception(f"Could not switch game context to {date}")
+
+    async def _claim_prewarm(
+        self, date: datetime.date, ttl: float | None = None
+    ) -> bool:
+        key = self._prewarm_key(date)
+        ttl = self.PREWARM_LEASE if ttl is None else ttl
         try:
-            return (await self.get_cache()).index(word) + 1
-        except ValueError:
-            return -1
+            if await self.backend.get(key) == self._prewarmer_id:
+                await self.backend.set(key, self._prewarmer_id, ttl)
+                return True
+            return await self.backend.add(key, self._prewarmer_id, ttl)
+        except Exception:
+            # better prewarmed by every worker than by none
+            logger.exception(f"Could not claim the prewarming of {date}")
+            return True
+
+    @staticmethod
+    def _prewarm_key(date: datetime.date) -> str:
+        return f"prewarmer:{date}"
+
+    async def _build(self, date: datetime.date) -> GameContext:
+        return await GameContext.build(AsyncSession(self.engine), self.model, date)
 
 
 class EasterEggLogic:
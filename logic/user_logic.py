@@ -1,29 +1,47 @@
 #!/usr/bin/env python
 from __future__ import annotations
 
+import asyncio
+import contextlib
 import datetime
 import hashlib
-from functools import lru_cache
+import json
+import time
+from collections import defaultdict
 from typing import TYPE_CHECKING
 
 from dateutil.relativedelta import relativedelta
+from sqlalchemy import case
 from sqlalchemy import func
-from sqlalchemy.exc import NoResultFound
-from sqlmodel import asc
+from sqlalchemy import insert
+from sqlalchemy import or_
+from sqlalchemy import update
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.exc import IntegrityError
 from sqlmodel import col
 from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from common import config
 from common import schemas
 from common import tables
+from common.backend import get_shared_backend
+from common.cache import AsyncTTLCache
+from common.cache import LRUCache
+from common.logger import logger
 from common.session import hs_transaction
+from logic.game_logic import SecretLogic
 
 if TYPE_CHECKING:
+    from typing import Any
     from typing import Awaitable
     from typing import Callable
+    from typing import Sequence
 
-    from sqlmodel import Session
-    from sqlmodel.sql.expression import SelectOfScalar
+    from sqlalchemy import Update
+    from sqlalchemy.ext.asyncio import AsyncConnection
+    from sqlalchemy.ext.asyncio import AsyncEngine
 
 
 class UserLogic:
@@ -35,9 +53,25 @@ class UserLogic:
         SUPER_ADMIN,
     )
 
-    def __init__(self, session: Session) -> None:
+    _users: AsyncTTLCache[str, tables.User | None] = AsyncTTLCache(
+        ttl=5 * 60,
+        maxsize=2048,
+        backend=get_shared_backend(),
+        name="user",
+        dumps=lambda user: user.model_dump_json() if user else "null",
+        loads=lambda dumped: UserLogic._load_user(dumped),
+    )
+
+    def __init__(self, session: AsyncSession) -> None:
         self.session = session
 
+    @staticmethod
+    def _load_user(dumped: str) -> tables.User | None:
+        # model_validate_json skips validation of table models, leaving
+        # datetimes as strings
+        data = json.loads(dumped)
+        return None if data is None else tables.User.model_validate(data)
+
     async def create_user(self, user_info: dict[str, str]) -> tables.User:
         user = {
             "email": user_info["email"],
@@ -50,23 +84,20 @@ class UserLogic:
             "family_name": user_info.get("family_name", ""),
             "first_login": datetime.datetime.now(tz=datetime.UTC),
         }
-        with hs_transaction(self.session, expire_on_commit=False) as session:
+        async with hs_transaction(self.session, expire_on_commit=False) as session:
             db_user = tables.User(**user)
             session.add(db_user)
             return db_user
 
     async def get_user(self, email: str) -> tables.User | None:
-        try:
-            return self._get_cached_user(self.session, email)
-        except NoResultFound:
-            return None
+        return await self._users.get(email, lambda: self._get_user(email))
 
-    @staticmethod
-    @lru_cache(maxsize=2048)
-    def _get_cached_user(session: Session, email: str) -> tables.User:
-        with hs_transaction(session, expire_on_commit=False) as session:
-            query = select(tables.User).where(tables.User.email == email)
-            return session.exec(query).one()
+    async def _get_user(self, email: str) -> tables.User | None:
+        query = select(tables.User).where(tables.User.email == email)
+        async with hs_transaction(
+            AsyncSession(self.session.bind), expire_on_commit=False
+        ) as session:
+            return (await session.exec(query)).one_or_none()
 
     @staticmethod
     def has_permissions(user: tables.User, permission: str) -> bool:
@@ -79,40 +110,53 @@ class UserLogic:
         if user is None:
             return False
 
-        with hs_transaction(self.session) as session:
+        async with hs_transaction(self.session) as session:
             query = select(tables.UserSubscription)
             query = query.where(tables.UserSubscription.uuid == subscription.message_id)
-            if session.exec(query).one_or_none() is None:
-                session.add(
-                    tables.UserSubscription(
-                        user_id=user.id,
-                        amount=subscription.amount,
-                        tier_name=subscription.tier_name,
-                        uuid=subscription.message_id,
-                        timestamp=subscription.timestamp,
-                    )
-                )
-                return True
-            else:
+            if (await session.exec(query)).one_or_none() is not None:
                 return False
+            db_subscription = tables.UserSubscription(
+                user_id=user.id,
+                amount=subscription.amount,
+                tier_name=subscription.tier_name,
+                uuid=subscription.message_id,
+                timestamp=subscription.timestamp,
+            )
+            session.add(db_subscription)
+            user_query = select(tables.User).where(tables.User.id == user.id)
+            db_user = (await session.exec(user_query.with_for_update())).one()
+            db_user.subscription_expiry = self.extend_subscription(
+                db_user.subscription_expiry, db_subscription
+            )
+            session.add(db_user)
+        await self._users.invalidate(subscription.email)
+        return True
 
-    def get_subscription_expiry(self, user: tables.User) -> datetime.datetime | None:
-        with hs_transaction(self.session, expire_on_commit=False) as session:
-            query = select(tables.UserSubscription)
-            query = query.where(tables.UserSubscription.user_id == user.id)
-            query = query.order_by(asc(tables.UserSubscription.timestamp))
-            subscriptions = session.exec(query).all()
-
-        expiry = None
-        now = datetime.datetime.now(datetime.UTC)
-        for subscription in subscriptions:
-            if expiry is None:
-                expiry = subscription.timestamp.replace(tzinfo=datetime.UTC)
-            expiry += self._get_subscription_duration(subscription)
-            if expiry < now:
-                expiry = None
+    @staticmethod
+    def get_subscription_expiry(user: tables.User) -> datetime.datetime | None:
+        if user.subscription_expiry is None:
+            return None
+        expiry = user.subscription_expiry.replace(tzinfo=datetime.UTC)
+        if expiry < datetime.datetime.now(datetime.UTC):
+            return None
         return expiry
 
+    @classmethod
+    def extend_subscription(
+        cls, expiry: datetime.datetime | None, subscription: tables.UserSubscription
+    ) -> datetime.datetime:
+        """The naive UTC expiry after `subscription`, given the one before it.
+
+        A subscription bought before `expiry` extends it, otherwise it starts
+        when it is bought.
+        """
+        start = subscription.timestamp
+        if start.tzinfo is not None:
+            start = start.astimezone(datetime.UTC).replace(tzinfo=None)
+        if expiry is not None and expiry > start:
+            start = expiry
+        return start + cls._get_subscription_duration(subscription)
+
     @staticmethod
     def _get_subscription_duration(
         subscription: tables.UserSubscription,
@@ -125,23 +169,41 @@ class UserLogic:
 
 
 class UserHistoryLogic:
+    # a day's history, read from the DB in `id` order, and the last `id` read
+    _histories: LRUCache[
+        tuple[int, datetime.date], tuple[int, list[schemas.DistanceResponse]]
+    ] = LRUCache(maxsize=getattr(config, "history_cache_size", 1024))
+    _latest_date: datetime.date | None = None
+
     def __init__(
         self,
-        session: Session,
+        session: AsyncSession,
         user: tables.User,
         date: datetime.date,
+        writer: UserHistoryWriter | None = None,
     ):
         self.session = session
         self.user = user
         self.date = date  # TODO: use this
+        self.writer = writer
 
     async def update_and_get_history(
         self, guess: schemas.DistanceResponse
     ) -> list[schemas.DistanceResponse]:
-        if guess.similarity is not None:
-            with hs_transaction(self.session) as session:
+        if guess.similarity is not None and self.writer is not None:
+            history = await self.get_history()
+            if guess.guess not in [h.guess for h in history]:
+                self.writer.add(self.user.id, self.date, guess)
+                history.append(
+                    guess.model_copy(update={"guess_number": len(history) + 1})
+                )
+                await self._record_guess(guess, len(history))
+            return history
+        elif guess.similarity is not None:
+            async with hs_transaction(self.session) as session:
                 history = await self._begun_get_history(session)
-                if guess.guess not in [h.guess for h in history]:
+                is_new = guess.guess not in [h.guess for h in history]
+                if is_new:
                     session.add(
                         tables.UserHistory(
                             user_id=self.user.id,
@@ -153,24 +215,71 @@ class UserHistoryLogic:
                             solver_count=guess.solver_count,
                         )
                     )
-                    history.append(guess)
+                    history.append(
+                        guess.model_copy(update={"guess_number": len(history) + 1})
+                    )
+            if is_new:
+                await self._record_guess(guess, len(history))
             return history
         else:
             return [guess] + await self.get_history()
 
+    async def _record_guess(
+        self, guess: schemas.DistanceResponse, guess_number: int
+    ) -> None:
+        stats_logic = UserStatisticsLogic(self.session, self.user)
+        await stats_logic.record_guess(self.date, guess, guess_number)
+
+    async def update_and_get_guess(
+        self, guess: schemas.DistanceResponse
+    ) -> schemas.DistanceResponse:
+        """Like `update_and_get_history`, but returns only `guess`, numbered."""
+        if guess.similarity is None:
+            return guess
+        history = await self.update_and_get_history(guess)
+        return next(historia for historia in history if historia.guess == guess.guess)
+
     async def get_history(self) -> list[schemas.DistanceResponse]:
-        with hs_transaction(self.session, expire_on_commit=False) as session:
-            return await self._begun_get_history(session=session)
+        # pending guesses are read first, so a flush in between cannot hide them
+        pending = (
+            []
+            if self.writer is None
+            else self.writer.get_pending(self.user.id, self.date)
+        )
+        async with hs_transaction(self.session, expire_on_commit=False) as session:
+            history = await self._begun_get_history(session=session)
+        guesses = {h.guess for h in history}
+        for guess in pending:
+            if guess.guess not in guesses:
+                guesses.add(guess.guess)
+                history.append(
+                    guess.model_copy(update={"guess_number": len(history) + 1})
+                )
+        return history
 
     async def _begun_get_history(
-        self, session: Session
+        self, session: AsyncSession
     ) -> list[schemas.DistanceResponse]:
-        history_query = select(tables.UserHistory)
-        history_query = history_query.where(tables.UserHistory.user_id == self.user.id)
-        history_query = history_query.where(tables.UserHistory.game_date == self.date)
-        history_query = history_query.order_by(col(tables.UserHistory.id))
-        history = session.exec(history_query).all()
-        return [
+        key = (self.user.id, self.date)
+        cached = self._histories.get(key)
+        last_id, history = (0, []) if cached is None else cached
+        count = None
+        if cached is not None:
+            saved_query = select(func.count(), func.max(tables.UserHistory.id))
+            saved_query = saved_query.where(
+                tables.UserHistory.user_id == self.user.id,
+                tables.UserHistory.game_date == self.date,
+            )
+            count, max_id = (await session.exec(saved_query)).one()
+            if (count, max_id or 0) == (len(history), last_id):
+                return list(history)
+        # only guesses saved since the history was cached are read, unless
+        # some were committed out of `id` order or deleted
+        new_history = await self._read_history(session, after_id=last_id)
+        if count is not None and len(history) + len(new_history) != count:
+            history = []
+            new_history = await self._read_history(session, after_id=0)
+        history = history + [
             schemas.DistanceResponse(
                 guess=historia.guess,
                 similarity=historia.similarity,
@@ -179,19 +288,223 @@ class UserHistoryLogic:
                 solver_count=historia.solver_count,
                 guess_number=i,
             )
-            for i, historia in enumerate(history, start=1)
+            for i, historia in enumerate(new_history, start=len(history) + 1)
         ]
+        if new_history:
+            last_id = new_history[-1].id
+        self._cache_history(key, last_id, history)
+        return list(history)
+
+    async def _read_history(
+        self, session: AsyncSession, after_id: int
+    ) -> Sequence[tables.UserHistory]:
+        history_query = select(tables.UserHistory)
+        history_query = history_query.where(tables.UserHistory.user_id == self.user.id)
+        history_query = history_query.where(tables.UserHistory.game_date == self.date)
+        history_query = history_query.where(col(tables.UserHistory.id) > after_id)
+        history_query = history_query.order_by(col(tables.UserHistory.id))
+        return (await session.exec(history_query)).all()
+
+    @classmethod
+    def _cache_history(
+        cls,
+        key: tuple[int, datetime.date],
+        last_id: int,
+        history: list[schemas.DistanceResponse],
+    ) -> None:
+        date = key[1]
+        if cls._latest_date is None or date > cls._latest_date:
+            cls._latest_date = date
+            # drop histories of past games, keeping the one that just ended
+            oldest = date - datetime.timedelta(days=1)
+            cls._histories.evict_where(lambda cached_key: cached_key[1] < oldest)
+        cls._histories.set(key, (last_id, history))
+
+
+class UserHistoryWriter:
+    """Write-behind buffer for guesses.
+
+    Guesses are kept in memory and inserted in bulk once `batch_size` of them
+    are pending or `flush_interval` seconds have passed, whichever is first.
+    Guesses that are already in the DB are skipped by the unique constraint.
+    """
+
+    # keeps multi-row inserts below MSSQL's limit of 2100 parameters
+    ROWS_PER_INSERT = 250
+
+    def __init__(
+        self, engine: AsyncEngine, batch_size: int = 500, flush_interval: float = 1.0
+    ):
+        self.engine = engine
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue_depth = 0
+        self.flushes = 0
+        self.failed_flushes = 0
+        self.flushed_rows = 0
+        self.last_flush_seconds = 0.0
+        self.max_flush_seconds = 0.0
+        self._pending: defaultdict[
+            tuple[int, datetime.date], list[schemas.DistanceResponse]
+        ] = defaultdict(list)
+        self._flushing: dict[
+            tuple[int, datetime.date], list[schemas.DistanceResponse]
+        ] = {}
+        self._full = asyncio.Event()
+        self._lock = asyncio.Lock()
+
+    def add(
+        self, user_id: int, date: datetime.date, guess: schemas.DistanceResponse
+    ) -> None:
+        self._pending[(user_id, date)].append(guess)
+        self.queue_depth += 1
+        if self.queue_depth >= self.batch_size:
+            self._full.set()
+
+    def get_pending(
+        self, user_id: int, date: datetime.date
+    ) -> list[schemas.DistanceResponse]:
+        key = (user_id, date)
+        return self._flushing.get(key, []) + self._pending.get(key, [])
+
+    @property
+    def stats(self) -> dict[str, int | float]:
+        return {
+            "queue_depth": self.queue_depth,
+            "flushes": self.flushes,
+            "failed_flushes": self.failed_flushes,
+            "flushed_rows": self.flushed_rows,
+            "last_flush_seconds": self.last_flush_seconds,
+            "max_flush_seconds": self.max_flush_seconds,
+        }
+
+    async def run(self) -> None:
+        while True:
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(self._full.wait(), self.flush_interval)
+            self._full.clear()
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Could not flush guesses, will retry")
+
+    async def flush(self) -> None:
+        async with self._lock:
+            if not self._pending:
+                return
+            self._flushing, self._pending = self._pending, defaultdict(list)
+            rows = [
+                {
+                    "user_id": user_id,
+                    "game_date": date,
+                    "guess": guess.guess,
+                    "similarity": guess.similarity,
+                    "distance": guess.distance,
+                    "egg": guess.egg,
+                    "solver_count": guess.solver_count,
+                }
+                for (user_id, date), guesses in self._flushing.items()
+                for guess in guesses
+            ]
+            start = time.perf_counter()
+            try:
+                async with self.engine.begin() as connection:
+                    for i in range(0, len(rows), self.ROWS_PER_INSERT):
+                        await self._insert(
+                            connection, rows[i : i + self.ROWS_PER_INSERT]
+                        )
+            except BaseException:
+                # including cancellation on shutdown, which flushes once more
+                for key, guesses in self._flushing.items():
+                    self._pending[key][:0] = guesses
+                self.failed_flushes += 1
+                raise
+            finally:
+                self._flushing = {}
+            self.queue_depth -= len(rows)
+            self.flushes += 1
+            self.flushed_rows += len(rows)
+            self.last_flush_seconds = time.perf_counter() - start
+            self.max_flush_seconds = max(
+                self.max_flush_seconds, self.last_flush_seconds
+            )
+
+    @staticmethod
+    async def _insert(connection: AsyncConnection, rows: list[dict[str, Any]]) -> None:
+        dialect = connection.dialect.name
+        if dialect in ("postgresql", "sqlite"):
+            dialect_insert = (
+                postgresql.insert if dialect == "postgresql" else sqlite.insert
+            )
+            query = dialect_insert(tables.UserHistory).values(rows)
+            await connection.execute(query.on_conflict_do_nothing())
+        else:
+            try:
+                async with connection.begin_nested():
+                    await connection.execute(insert(tables.UserHistory).values(rows))
+            except IntegrityError:
+                for row in rows:
+                    with contextlib.suppress(IntegrityError):
+                        async with connection.begin_nested():
+                            await connection.execute(
+                                insert(tables.UserHistory).values(row)
+                            )
 
 
 class UserStatisticsLogic:
-    def __init__(self, session: Session, user: tables.User):
+    def __init__(self, session: AsyncSession, user: tables.User):
         self.session = session
         self.user = user
 
     async def get_statistics(self) -> schemas.UserStatistics:
-        stats_subquery = select(
-            tables.UserHistory.similarity,
-            tables.UserHistory.solver_count,
+        async with hs_transaction(self.session, expire_on_commit=False) as session:
+            stats = await self._begun_get_stats(session)
+
+        today = datetime.datetime.now(datetime.UTC).date()
+        return schemas.UserStatistics(
+            game_streak=stats.current_streak if stats.last_game_date == today else 0,
+            highest_rank=stats.best_rank,
+            total_games_played=stats.games_played,
+            total_games_won=stats.games_won,
+            average_guesses=(
+                stats.total_guesses_to_win / stats.games_won if stats.games_won else 0
+            ),
+        )
+
+    async def record_guess(
+        self, date: datetime.date, guess: schemas.DistanceResponse, guess_number: int
+    ) -> None:
+        """Updates the statistics with a guess that was just saved."""
+        queries = []
+        if guess_number == 1:
+            queries.append(self._played_query(date))
+        if guess.similarity == 100:
+            queries.append(self._won_query(date, guess_number, guess.solver_count))
+        if not queries:
+            return
+        async with hs_transaction(self.session) as session:
+            await self._begun_get_stats(session)
+            connection = await session.connection()
+            for query in queries:
+                await connection.execute(query)
+
+    async def rebuild(self) -> tables.UserStats:
+        async with hs_transaction(self.session, expire_on_commit=False) as session:
+            return await self._begun_rebuild(session)
+
+    async def _begun_get_stats(self, session: AsyncSession) -> tables.UserStats:
+        query = select(tables.UserStats)
+        query = query.where(tables.UserStats.user_id == self.user.id)
+        stats = (await session.exec(query)).one_or_none()
+        if stats is None:
+            stats = await self._begun_rebuild(session)
+        return stats
+
+    async def _begun_rebuild(self, session: AsyncSession) -> tables.UserStats:
+        wins_subquery = select(
+            col(tables.UserHistory.similarity),
+            col(tables.UserHistory.solver_count),
+            col(tables.UserHistory.game_date),
             func.row_number()
             .over(
                 partition_by=[col(tables.UserHistory.game_date)],
@@ -199,54 +512,97 @@ class UserStatisticsLogic:
             )
             .label("guess_number"),
         )
-        stats_subquery = stats_subquery.select_from(tables.UserHistory)
-        stats_subquery = stats_subquery.where(
-            tables.UserHistory.user_id == self.user.id
-        )
-        stats_sub = stats_subquery.subquery()
-        stats_query = select(
+        wins_subquery = wins_subquery.select_from(tables.UserHistory)
+        wins_subquery = wins_subquery.where(tables.UserHistory.user_id == self.user.id)
+        wins_sub = wins_subquery.subquery()
+        wins_query = select(
             func.count(),
-            func.min(stats_sub.c.solver_count),
-            func.avg(stats_sub.c.guess_number),
-        )
-        stats_query = stats_query.select_from(stats_sub)
-        stats_query = stats_query.where(stats_sub.c.similarity == 100)
-
-        with hs_transaction(self.session, expire_on_commit=False) as session:
-            stats = session.exec(stats_query).one_or_none()
-
-        if stats is None:
-            total_games_won, highest_rank, avg_guesses = 0, None, 0
-        else:
-            total_games_won, highest_rank, avg_guesses = stats
-
-        game_streak, total_games_played = self._get_game_streak_and_total()
-
-        return schemas.UserStatistics(
-            game_streak=game_streak,
-            highest_rank=highest_rank,
-            total_games_played=total_games_played,
-            total_games_won=total_games_won or 0,
-            average_guesses=avg_guesses or 0,
+            func.min(wins_sub.c.solver_count),
+            func.sum(wins_sub.c.guess_number),
+            func.max(wins_sub.c.game_date),
         )
+        wins_query = wins_query.select_from(wins_sub)
+        wins_query = wins_query.where(wins_sub.c.similarity == 100)
+        games_won, best_rank, total_guesses_to_win, last_won_date = (
+            await session.exec(wins_query)
+        ).one()
 
-    def _get_game_streak_and_total(self) -> tuple[int, int]:
         dates_query = select(col(tables.UserHistory.game_date))
         dates_query = dates_query.where(tables.UserHistory.user_id == self.user.id)
         dates_query = dates_query.group_by(col(tables.UserHistory.game_date))
-        dates_query = dates_query.order_by(col(tables.UserHistory.game_date).desc())
-        with hs_transaction(session=self.session, expire_on_commit=False) as session:
-            game_dates = session.exec(dates_query).all()
-
-        date = datetime.datetime.now(datetime.UTC).date()
-        game_streak = 0
-        for game_date in game_dates:
-            if date == game_date:
-                game_streak += 1
-                date -= datetime.timedelta(days=1)
+        dates_query = dates_query.order_by(col(tables.UserHistory.game_date))
+        game_dates = (await session.exec(dates_query)).all()
+
+        streak = longest_streak = 0
+        for i, game_date in enumerate(game_dates):
+            if i > 0 and game_dates[i - 1] == game_date - datetime.timedelta(days=1):
+                streak += 1
             else:
-                break
-        return game_streak, len(game_dates)
+                streak = 1
+            longest_streak = max(longest_streak, streak)
+
+        stats_query = select(tables.UserStats)
+        stats_query = stats_query.where(tables.UserStats.user_id == self.user.id)
+        stats = (await session.exec(stats_query)).one_or_none()
+        if stats is None:
+            stats = tables.UserStats(user_id=self.user.id)
+        stats.games_played = len(game_dates)
+        stats.games_won = games_won
+        stats.total_guesses_to_win = int(total_guesses_to_win or 0)
+        stats.best_rank = best_rank
+        stats.current_streak = streak
+        stats.longest_streak = longest_streak
+        stats.last_game_date = game_dates[-1] if game_dates else None
+        stats.last_won_date = last_won_date
+        session.add(stats)
+        await session.flush()
+        return stats
+
+    def _played_query(self, date: datetime.date) -> Update:
+        stats = tables.UserStats
+        # guarded by the date, so that recording a guess twice counts it once
+        streak = case(
+            (
+                col(stats.last_game_date) == date - datetime.timedelta(days=1),
+                stats.current_streak + 1,
+            ),
+            else_=1,
+        )
+        query = update(stats).where(col(stats.user_id) == self.user.id)
+        query = query.where(
+            or_(col(stats.last_game_date).is_(None), col(stats.last_game_date) < date)
+        )
+        return query.values(
+            games_played=stats.games_played + 1,
+            current_streak=streak,
+            longest_streak=case(
+                (streak > stats.longest_streak, streak), else_=stats.longest_streak
+            ),
+            last_game_date=date,
+        )
+
+    def _won_query(
+        self, date: datetime.date, guess_number: int, rank: int | None
+    ) -> Update:
+        stats = tables.UserStats
+        query = update(stats).where(col(stats.user_id) == self.user.id)
+        query = query.where(
+            or_(col(stats.last_won_date).is_(None), col(stats.last_won_date) < date)
+        )
+        query = query.values(
+            games_won=stats.games_won + 1,
+            total_guesses_to_win=stats.total_guesses_to_win + guess_number,
+            last_won_date=date,
+        )
+        if rank is not None:
+            query = query.values(
+                best_rank=case(
+                    (col(stats.best_rank).is_(None), rank),
+                    (col(stats.best_rank) > rank, rank),
+                    else_=stats.best_rank,
+                )
+            )
+        return query
 
 
 class UserClueLogic:
@@ -256,91 +612,109 @@ class UserClueLogic:
     NO_MORE_CLUES_STR = "אין יותר רמזים"
     CLUE_COOLDOWN_FOR_UNSUBSCRIBED = datetime.timedelta(days=7)
     MAX_CLUES_DURING_COOLDOWN = 5
-    HOT_CLUES_CACHE: dict[str, list[str]] = {}
+    HOT_CLUES_CACHE: AsyncTTLCache[datetime.date, list[str]] = AsyncTTLCache(
+        ttl=24 * 60 * 60, maxsize=64, backend=get_shared_backend(), name="hot_clues"
+    )
 
     def __init__(
         self,
-        session: Session,
+        session: AsyncSession,
         user: tables.User,
         secret: str,
         date: datetime.date,
+        hot_clues: Sequence[str] | None = None,
     ):
         self.session = session
         self.user = user
         self.secret = secret
         self.date = date
+        self.hot_clues = hot_clues
 
-    @property
-    def clues(self) -> list[Callable[[], Awaitable[str]]]:
+    @classmethod
+    async def invalidate(cls, date: datetime.date) -> None:
+        await cls.HOT_CLUES_CACHE.invalidate(date)
+
+    async def get_clues(self) -> list[Callable[[], Awaitable[str]]]:
         return [
             self._get_clue_char,
             self._get_secret_len,
-            *self._get_hot_clue_funcs(),
+            *await self._get_hot_clue_funcs(),
         ]
 
-    @property
-    def clues_used(self) -> int:
-        with hs_transaction(self.session) as session:
+    async def get_clues_used(self) -> int:
+        async with hs_transaction(self.session) as session:
             query = select(tables.UserClueCount.clue_count)
             query = query.where(tables.UserClueCount.user_id == self.user.id)
             query = query.where(tables.UserClueCount.game_date == self.date)
-            return session.exec(query).one_or_none() or 0
+            return (await session.exec(query)).one_or_none() or 0
 
     async def get_clue(self) -> str | None:
-        user_logic = UserLogic(self.session)
-        expiry = user_logic.get_subscription_expiry(self.user)
-        if expiry is None or expiry < datetime.datetime.now(datetime.UTC):
-            has_active_subscription = False
-        else:
-            has_active_subscription = True
-        if self.clues_used < len(self.clues):
+        has_active_subscription = (
+            UserLogic.get_subscription_expiry(self.user) is not None
+        )
+        clues = await self.get_clues()
+        async with hs_transaction(self.session) as session:
+            clues_used, recent_clues_used = await self._begun_get_clue_state(session)
+            if clues_used >= len(clues):
+                return None
+            # TODO: verify this logic is correct
             if (
                 not has_active_subscription
-                and await self._used_max_clues_for_inactive()
+                and recent_clues_used >= self.MAX_CLUES_DURING_COOLDOWN
             ):
                 raise ValueError()  # TODO: custom exception
-            clue = await self.clues[self.clues_used]()
-            await self._update_clue_usage()
-            return clue
-        else:
-            return None
+            await self._begun_update_clue_usage(session)
+        return await clues[clues_used]()
 
     async def get_all_clues_used(self) -> list[str]:
-        clues = []
-        for i in range(self.clues_used):
-            clues.append(await self.clues[i]())
-        return clues
-
-    async def _used_max_clues_for_inactive(self) -> bool:
-        # TODO: verify this logic is correct
-        with hs_transaction(self.session) as session:
-            query: SelectOfScalar[int] = select(
-                func.sum(tables.UserClueCount.clue_count)
-            )
-            query = query.where(tables.UserClueCount.user_id == self.user.id)
-            query = query.where(
-                tables.UserClueCount.game_date
-                > self.date - self.CLUE_COOLDOWN_FOR_UNSUBSCRIBED
+        clues = await self.get_clues()
+        return [await clue() for clue in clues[: await self.get_clues_used()]]
+
+    async def _begun_get_clue_state(self, session: AsyncSession) -> tuple[int, int]:
+        """Clues used today, and during the cooldown for the unsubscribed."""
+        clue_count = col(tables.UserClueCount.clue_count)
+        query = select(
+            func.coalesce(
+                func.sum(
+                    case((col(tables.UserClueCount.game_date) == self.date, clue_count))
+                ),
+                0,
+            ),
+            func.coalesce(func.sum(clue_count), 0),
+        )
+        query = query.where(tables.UserClueCount.user_id == self.user.id)
+        query = query.where(
+            tables.UserClueCount.game_date
+            > self.date - self.CLUE_COOLDOWN_FOR_UNSUBSCRIBED
+        )
+        clues_used, recent_clues_used = (await session.exec(query)).one()
+        return clues_used, recent_clues_used
+
+    async def _begun_update_clue_usage(self, session: AsyncSession) -> None:
+        connection = await session.connection()
+        values = {"user_id": self.user.id, "game_date": self.date, "clue_count": 1}
+        dialect = connection.dialect.name
+        if dialect in ("postgresql", "sqlite"):
+            dialect_insert = (
+                postgresql.insert if dialect == "postgresql" else sqlite.insert
             )
-            used_clues = session.exec(query).one() or 0
-            return used_clues >= self.MAX_CLUES_DURING_COOLDOWN
-
-    async def _update_clue_usage(self) -> None:
-        with hs_transaction(self.session) as session:
-            clue_count_query = select(tables.UserClueCount).where(
-                tables.UserClueCount.user_id == self.user.id,
-                tables.UserClueCount.game_date == self.date,
+            query = dialect_insert(tables.UserClueCount).values(values)
+            query = query.on_conflict_do_update(
+                index_elements=["user_id", "game_date"],
+                set_={"clue_count": tables.UserClueCount.clue_count + 1},
             )
-            clue_count = session.exec(clue_count_query).first()
-            if clue_count is None:
-                clue_count = tables.UserClueCount(
-                    user_id=self.user.id,
-                    game_date=self.date,
-                    clue_count=1,
-                )
-            else:
-                clue_count.clue_count += 1
-            session.add(clue_count)
+            await connection.execute(query)
+            return
+        update_query = update(tables.UserClueCount)
+        update_query = update_query.where(
+            col(tables.UserClueCount.user_id) == self.user.id,
+            col(tables.UserClueCount.game_date) == self.date,
+        )
+        update_query = update_query.values(
+            clue_count=tables.UserClueCount.clue_count + 1
+        )
+        if (await connection.execute(update_query)).rowcount == 0:
+            await connection.execute(insert(tables.UserClueCount).values(values))
 
     async def _get_clue_char(self) -> str:
         digest = hashlib.md5(self.secret.encode()).hexdigest()
@@ -351,26 +725,21 @@ class UserClueLogic:
     async def _get_secret_len(self) -> str:
         return self.CLUE_LEN_FORMAT.format(clue_len=len(self.secret))
 
-    def _get_hot_clue_funcs(self) -> list[Callable[[], Awaitable[str]]]:
+    async def _get_hot_clue_funcs(self) -> list[Callable[[], Awaitable[str]]]:
         def hot_clue_func_generator(hot_clue: str) -> Callable[[], Awaitable[str]]:
             async def get_hot_clue() -> str:
                 return self.HOT_CLUE_FORMAT.format(hot_clue=hot_clue)
 
             return get_hot_clue
 
-        hot_clues = self._get_hot_clues()
+        hot_clues = await self._get_hot_clues()
         return [hot_clue_func_generator(clue) for clue in hot_clues]
 
-    def _get_hot_clues(self) -> list[str]:
-        if self.secret not in self.HOT_CLUES_CACHE:
-            with hs_transaction(self.session) as session:
-                query = (
-                    select(tables.HotClue)
-                    .join(tables.SecretWord)
-                    .where(tables.SecretWord.game_date == self.date)
-                )
-                hot_clues = session.exec(query).all()
-                self.HOT_CLUES_CACHE[self.secret] = [
-                    hot_clue.clue for hot_clue in hot_clues
-                ]
-        return self.HOT_CLUES_CACHE[self.secret]
+    async def _get_hot_clues(self) -> list[str]:
+        if self.hot_clues is not None:
+            return list(self.hot_clues)
+        return await self.HOT_CLUES_CACHE.get(self.date, self._load_hot_clues)
+
+    async def _load_hot_clues(self) -> list[str]:
+        secret_logic = SecretLogic(AsyncSession(self.session.bind), dt=self.date)
+        return await secret_logic.get_hot_clues()
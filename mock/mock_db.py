@@ -5,10 +5,10 @@ from typing import TYPE_CHECKING
 
 from sqlalchemy import Engine
 from sqlalchemy import event
-from sqlmodel import Session
+from sqlalchemy.ext.asyncio import create_async_engine
 from sqlmodel import SQLModel
 from sqlmodel import StaticPool
-from sqlmodel import create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 if TYPE_CHECKING:
     from typing import Any
@@ -27,11 +27,10 @@ def collation(string1: str, string2: str) -> int:
 
 
 @event.listens_for(Engine, "connect")
-def set_sqlite_pragma(
-    dbapi_connection: sqlite3.Connection, dummy_connection_record: Any
-) -> None:
-    dbapi_connection.create_collation("Hebrew_100_CI_AI_SC_UTF8", collation)
-    dbapi_connection.create_collation("Hebrew_CI_AI", collation)
+def set_sqlite_pragma(dbapi_connection: Any, dummy_connection_record: Any) -> None:
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        dbapi_connection.create_collation("Hebrew_100_CI_AI_SC_UTF8", collation)
+        dbapi_connection.create_collation("Hebrew_CI_AI", collation)
     cursor = dbapi_connection.cursor()
     cursor.execute("PRAGMA foreign_keys=ON")
     cursor.close()
@@ -39,29 +38,35 @@ def set_sqlite_pragma(
 
 class MockDb:
     def __init__(self) -> None:
-        self.db_uri = "sqlite:///:memory:?cache=shared"
-        self.engine = create_engine(
+        self.db_uri = "sqlite+aiosqlite:///:memory:"
+        self.engine = create_async_engine(
             self.db_uri,
             connect_args={"check_same_thread": False},
             poolclass=StaticPool,
         )
-        self.session = Session(
+        self.session = AsyncSession(
             bind=self.engine,
             expire_on_commit=False,
             autoflush=True,
         )
-        SQLModel.metadata.create_all(self.engine)
 
-    def add(self, entity: T) -> T:
-        self.session.begin()
+    @classmethod
+    async def create(cls) -> MockDb:
+        db = cls()
+        async with db.engine.begin() as connection:
+            await connection.run_sync(SQLModel.metadata.create_all)
+        return db
+
+    async def add(self, entity: T) -> T:
+        await self.session.begin()
         self.session.add(entity)
-        self.session.commit()
+        await self.session.commit()
         return entity
 
-    def add_many(self, entities: list[T]) -> None:
-        self.session.begin()
+    async def add_many(self, entities: list[T]) -> None:
+        await self.session.begin()
         for entity in entities:
             self.session.add(entity)
-        self.session.commit()
+        await self.session.commit()
         for entity in entities:
-            self.session.refresh(entity)
+            await self.session.refresh(entity)
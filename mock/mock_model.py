@@ -0,0 +1,18 @@
+from __future__ import annotations
+
+import itertools
+
+import numpy as np
+from gensim.models import KeyedVectors
+
+from model import GensimModel
+
+
+def make_model(vocab_size: int = 1500, dim: int = 20) -> GensimModel:
+    letters = [chr(c) for c in range(ord("א"), ord("ת") + 1)]
+    words = ["".join(p) for p in itertools.product(letters, repeat=3)][:vocab_size]
+    words += ["א", "hello", "שלוםhello"]
+    rng = np.random.default_rng(seed=42)
+    kv = KeyedVectors(vector_size=dim)
+    kv.add_vectors(words, rng.normal(size=(len(words), dim)).astype(np.float32))
+    return GensimModel(kv)
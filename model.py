@@ -1,28 +1,99 @@
 from __future__ import annotations
 
+import random
+import re
 from typing import TYPE_CHECKING
 
 import numpy as np
+import numpy.typing as npt
 from gensim.models import KeyedVectors
 
 if TYPE_CHECKING:
     from typing import AsyncIterator
 
+    from common.typing import np_float64_arr
     from common.typing import np_float_arr
 
 
+HEBREW_WORD = re.compile("[א-ת]*")
+
+
 class GensimModel:
-    def __init__(self, model: KeyedVectors):
+    # rounded similarities closer than this (in cosine units) may end up tied
+    TIE_MARGIN = 1e-4
+
+    def __init__(self, model: KeyedVectors, normalized: bool = False):
         self.model = model
+        self._normed_vectors: np_float_arr | None = (
+            model.vectors if normalized else None
+        )
+        # built once, so lookups and scans never re-check a word's letters
+        self.word_to_index: dict[str, int] = {
+            word: index
+            for index, word in enumerate(model.index_to_key)
+            if isinstance(word, str) and self.is_playable(word)
+        }
+        self.playable_rows: npt.NDArray[np.intp] = np.fromiter(
+            self.word_to_index.values(), dtype=np.intp, count=len(self.word_to_index)
+        )
+
+    @classmethod
+    def from_flat(cls, vectors_path: str, vocab_path: str) -> GensimModel:
+        """Loads a model exported by `export_flat`.
+
+        The vectors are memory-mapped rather than read, so loading is almost
+        instant and all processes using the same files share their pages.
+        """
+        vectors = np.load(vectors_path, mmap_mode="r")
+        with open(vocab_path, encoding="utf-8") as vocab_file:
+            index_to_key = vocab_file.read().split("\n")
+        if len(index_to_key) != len(vectors):
+            raise ValueError(f"{vocab_path} does not match {vectors_path}")
+        model = KeyedVectors(vector_size=vectors.shape[1])
+        model.vectors = vectors
+        model.norms = np.ones(len(vectors), dtype=np.float32)
+        model.index_to_key = index_to_key
+        model.key_to_index = {word: index for index, word in enumerate(index_to_key)}
+        return cls(model, normalized=True)
+
+    def export_flat(self, vectors_path: str, vocab_path: str) -> None:
+        """Saves the normalized vectors as a flat `.npy` matrix, and the words as a
+        newline separated file whose n-th line is the word of the n-th row.
+        """
+        np.save(vectors_path, self.normed_vectors)
+        with open(vocab_path, "w", encoding="utf-8") as vocab_file:
+            vocab_file.write("\n".join(str(word) for word in self.model.index_to_key))
+
+    def preload(self) -> None:
+        """Builds the lazily computed structures up front, e.g. before forking."""
+        self.normed_vectors
+
+    @property
+    def normed_vectors(self) -> np_float_arr:
+        if self._normed_vectors is None:
+            normed: np_float_arr = self.model.get_normed_vectors().astype(np.float32)
+            self._normed_vectors = normed
+        return self._normed_vectors
+
+    @staticmethod
+    def is_playable(word: str) -> bool:
+        return len(word) != 1 and HEBREW_WORD.fullmatch(word) is not None
+
+    def get_index(self, word: str) -> int | None:
+        return self.word_to_index.get(word)
+
+    def get_random_word(self, top_sample: int | None = None) -> str:
+        if top_sample is None or top_sample > len(self.playable_rows):
+            top_sample = len(self.playable_rows)
+        index = self.playable_rows[random.randrange(top_sample)]
+        word: str = self.model.index_to_key[index]
+        return word
 
     async def get_vector(self, word: str) -> np_float_arr | None:
-        if not all(ord("א") <= ord(c) <= ord("ת") for c in word):
-            return None
-        if len(word) == 1:
+        index = self.get_index(word)
+        if index is None:
             return None
-        if word not in self.model:
-            return None
-        vector: np_float_arr = self.model[word].tolist()
+        vector: np_float_arr = self.model.vectors[index].tolist()
         return vector
 
     async def get_similarities(
@@ -37,15 +108,51 @@ class GensimModel:
         )
         return similarities
 
+    async def get_all_similarities(self, vector: np_float_arr) -> np_float64_arr:
+        """The similarity of every word to `vector`, as `calc_similarity` rounds it.
+
+        The cosines are computed in a single float32 product, so a few words in
+        ten thousand round to 0.01 away from `calc_similarity`. They are scaled
+        and rounded in float64, like the similarities it returns.
+        """
+        cosine = self.normed_vectors @ self._unit(vector)
+        similarities: np_float64_arr = np.round(cosine.astype(np.float64) * 100, 2)
+        return similarities
+
+    async def get_closest(self, vector: np_float_arr, topn: int) -> list[str]:
+        """Returns the `topn` playable words closest to `vector`, ascending.
+
+        The normalized matrix product only preselects candidates; they are then
+        rescored with `calc_similarity` and sorted by (similarity, word), so the
+        result is identical to scoring every word one by one.
+        """
+        rows = self.playable_rows
+        cosine = (self.normed_vectors @ self._unit(vector))[rows]
+        if len(rows) > topn:
+            top = np.argpartition(cosine, -topn)[-topn:]
+            threshold = cosine[top].min() - self.TIE_MARGIN
+            candidates = rows[cosine >= threshold]
+        else:
+            candidates = rows
+        nearest = sorted(
+            [
+                (
+                    await self.calc_similarity(self.model.vectors[i], vector),
+                    self.model.index_to_key[i],
+                )
+                for i in candidates
+            ]
+        )
+        return [word for _, word in nearest[-topn:]]
+
+    @staticmethod
+    def _unit(vector: np_float_arr) -> np_float_arr:
+        unit: np_float_arr = np.asarray(vector, dtype=np.float32)
+        return unit / np.linalg.norm(unit)
+
     async def iterate_all(self) -> AsyncIterator[tuple[str, np_float_arr]]:
-        for word in self.model.key_to_index.keys():
-            if isinstance(word, str):
-                vector = await self.get_vector(word)
-            else:
-                continue
-            if vector is None:
-                continue
-            yield word, self.model[word]
+        for word, index in self.word_to_index.items():
+            yield word, self.model.vectors[index]
 
     async def calc_similarity(self, vec1: np_float_arr, vec2: np_float_arr) -> float:
         similarities: np_float_arr = self.model.cosine_similarities(
@@ -0,0 +1,145 @@
+#!/usr/bin/env python
+"""A pre-forking uvicorn supervisor.
+
+The app (and with it the model) is imported once in the parent process, which
+then forks the workers. The workers share the parent's memory copy-on-write, so
+adding workers does not multiply the memory used by the model.
+
+Signals to the parent:
+    SIGTERM / SIGINT - gracefully stop all workers and exit.
+    SIGHUP - gracefully replace the workers with freshly forked ones.
+    SIGTTIN / SIGTTOU - add / remove a worker.
+"""
+
+from __future__ import annotations
+
+import gc
+import logging
+import os
+import signal
+import time
+from typing import TYPE_CHECKING
+
+import uvicorn
+
+if TYPE_CHECKING:
+    import socket
+    from types import FrameType
+    from typing import Callable
+
+logger = logging.getLogger("uvicorn.error")
+
+
+class PreforkServer:
+    # a worker that dies sooner than this after being forked is considered crashing
+    MIN_WORKER_LIFETIME = 1.0
+    RESPAWN_BACKOFF = 1.0
+
+    def __init__(
+        self,
+        config: uvicorn.Config,
+        workers: int,
+        preload: Callable[[], None] | None = None,
+    ) -> None:
+        self.config = config
+        self.workers = workers
+        self.preload = preload
+        self.processes: dict[int, float] = {}
+        self.retiring: set[int] = set()
+        self.should_exit = False
+        self.socket: socket.socket | None = None
+
+    def run(self) -> None:
+        self.config.load()
+        if self.preload is not None:
+            self.preload()
+        self.socket = self.config.bind_socket()
+        # objects created so far are never collected, so the collector never
+        # writes to (and thus un-shares) their pages in the workers
+        gc.freeze()
+
+        signal.signal(signal.SIGTERM, self._handle_exit)
+        signal.signal(signal.SIGINT, self._handle_exit)
+        signal.signal(signal.SIGHUP, self._handle_restart)
+        signal.signal(signal.SIGTTIN, self._handle_increase)
+        signal.signal(signal.SIGTTOU, self._handle_decrease)
+
+        logger.info(f"Started prefork supervisor [{os.getpid()}]")
+        for _ in range(self.workers):
+            self._spawn()
+        self._supervise()
+        self.socket.close()
+        logger.info(f"Stopped prefork supervisor [{os.getpid()}]")
+
+    def _supervise(self) -> None:
+        while self.processes:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            started_at = self.processes.pop(pid, None)
+            if started_at is None:
+                continue
+            if pid in self.retiring:
+                self.retiring.discard(pid)
+                continue
+            code = os.waitstatus_to_exitcode(status)
+            if self.should_exit:
+                continue
+            logger.warning(f"Worker [{pid}] exited with code {code}, respawning")
+            if time.monotonic() - started_at < self.MIN_WORKER_LIFETIME:
+                time.sleep(self.RESPAWN_BACKOFF)
+            self._spawn()
+
+    def _spawn(self) -> int:
+        assert self.socket is not None
+        pid = os.fork()
+        if pid == 0:
+            for sig in (
+                signal.SIGTERM,
+                signal.SIGINT,
+                signal.SIGHUP,
+                signal.SIGTTIN,
+                signal.SIGTTOU,
+            ):
+                signal.signal(sig, signal.SIG_DFL)
+            code = 0
+            try:
+                uvicorn.Server(config=self.config).run(sockets=[self.socket])
+            except BaseException:
+                logger.exception(f"Worker [{os.getpid()}] crashed")
+                code = 1
+            finally:
+                os._exit(code)
+        self.processes[pid] = time.monotonic()
+        logger.info(f"Started worker [{pid}]")
+        return pid
+
+    def _retire(self, pid: int) -> None:
+        self.retiring.add(pid)
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+
+    def _handle_exit(self, sig: int, frame: FrameType | None) -> None:
+        self.should_exit = True
+        for pid in list(self.processes):
+            self._retire(pid)
+
+    def _handle_restart(self, sig: int, frame: FrameType | None) -> None:
+        # new workers start accepting on the shared socket before the old ones
+        # stop, and the old ones finish their in-flight requests before exiting
+        for pid in [p for p in self.processes if p not in self.retiring]:
+            self._spawn()
+            self._retire(pid)
+
+    def _handle_increase(self, sig: int, frame: FrameType | None) -> None:
+        self.workers += 1
+        self._spawn()
+
+    def _handle_decrease(self, sig: int, frame: FrameType | None) -> None:
+        active = [p for p in self.processes if p not in self.retiring]
+        if len(active) > 1:
+            self.workers -= 1
+            self._retire(active[-1])
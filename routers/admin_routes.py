@@ -1,5 +1,4 @@
 import datetime
-import random
 
 from fastapi import APIRouter
 from fastapi import Depends
@@ -7,15 +6,17 @@ from fastapi import HTTPException
 from fastapi.requests import Request
 from fastapi.responses import HTMLResponse
 from pydantic import BaseModel
-from sqlmodel import Session
 from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from common import tables
 from common.consts import FIRST_DATE
 from common.session import hs_transaction
 from logic.game_logic import CacheSecretLogic
 from logic.game_logic import SecretLogic
+from logic.game_logic import VectorLogic
 from model import GensimModel
+from routers.base import DBSession
 from routers.base import render
 from routers.base import super_admin
 
@@ -25,9 +26,9 @@ admin_router = APIRouter(prefix="/admin", dependencies=[Depends(super_admin)])
 
 
 @admin_router.get("/set-secret", response_class=HTMLResponse, include_in_schema=False)
-async def index(request: Request) -> HTMLResponse:
+async def index(request: Request, session: DBSession) -> HTMLResponse:
     model = request.app.state.model
-    secret_logic = SecretLogic(request.app.state.session)
+    secret_logic = SecretLogic(session)
     all_secrets = [
         secret[0] for secret in await secret_logic.get_all_secrets(with_future=True)
     ]
@@ -44,9 +45,8 @@ async def index(request: Request) -> HTMLResponse:
 
 @admin_router.get("/model", include_in_schema=False)
 async def get_word_data(
-    request: Request, word: str
+    request: Request, session: DBSession, word: str
 ) -> dict[str, list[str] | datetime.date | int]:
-    session = request.app.state.session
     model = request.app.state.model
     logic = CacheSecretLogic(
         session=session,
@@ -66,14 +66,33 @@ async def get_word_data(
     }
 
 
+@admin_router.get("/cache-stats", include_in_schema=False)
+async def get_cache_stats() -> dict[str, dict[str, int]]:
+    return {
+        "closest1000": CacheSecretLogic._cache_dict.stats,
+        "game_tables": CacheSecretLogic._game_tables.stats,
+        "secret_vectors": VectorLogic._secret_cache.stats,
+    }
+
+
+@admin_router.get("/history-writer-stats", include_in_schema=False)
+async def get_history_writer_stats(request: Request) -> dict[str, int | float]:
+    writer = request.app.state.history_writer
+    if writer is None:
+        raise HTTPException(status_code=404, detail="Write-behind is disabled")
+    stats: dict[str, int | float] = writer.stats
+    return stats
+
+
 class SetSecretRequest(BaseModel):
     secret: str
     clues: list[str]
 
 
 @admin_router.post("/set-secret", include_in_schema=False)
-async def set_new_secret(request: Request, set_secret: SetSecretRequest) -> str:
-    session = request.app.state.session
+async def set_new_secret(
+    request: Request, session: DBSession, set_secret: SetSecretRequest
+) -> str:
     model = request.app.state.model
     logic = CacheSecretLogic(
         session=session,
@@ -88,16 +107,14 @@ async def set_new_secret(request: Request, set_secret: SetSecretRequest) -> str:
 
 # TODO: everything below here should be in a separate file, and set_secret script should be updated to use it
 async def get_random_word(model: GensimModel) -> str:
-    rand_index = random.randint(0, TOP_SAMPLE)
-    word: str = model.model.index_to_key[rand_index]
-    return word
+    return model.get_random_word(TOP_SAMPLE)
 
 
-async def get_date(session: Session) -> datetime.date:
+async def get_date(session: AsyncSession) -> datetime.date:
     query = select(tables.SecretWord.game_date)  # type: ignore
     query = query.order_by(tables.SecretWord.game_date.desc())  # type: ignore
-    with hs_transaction(session) as s:
-        latest: datetime.date = s.exec(query).first()
+    async with hs_transaction(session) as s:
+        latest: datetime.date = (await s.exec(query)).first()
 
     dt = latest + datetime.timedelta(days=1)
     return dt
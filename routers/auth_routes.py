@@ -11,6 +11,7 @@ from fastapi.responses import RedirectResponse
 from starlette.responses import HTMLResponse
 
 from logic.auth_logic import AuthLogic
+from routers.base import DBSession
 
 auth_router = APIRouter()
 
@@ -18,13 +19,14 @@ auth_router = APIRouter()
 @auth_router.post("/login")
 async def login(
     request: Request,
+    session: DBSession,
     credential: Annotated[str, Form()],
     state: Annotated[str, Form()] = "",
 ) -> HTMLResponse:
     try:
         parsed_state = urllib.parse.parse_qs(state)
         auth_logic = AuthLogic(
-            request.app.state.session,
+            session,
             request.app.state.google_app["client_id"],
         )
         encoded_jwt = await auth_logic.jwt_from_credential(credential)
@@ -72,6 +74,8 @@ async def logout(
         path = redirect.path.decode()
     else:
         path = redirect.path
+    if access_token := request.cookies.get("access_token"):
+        await AuthLogic.revoke_token(access_token)
     response = RedirectResponse(path, status_code=status.HTTP_302_FOUND)
     response.delete_cookie(key="access_token")
     return response
@@ -3,47 +3,83 @@ from __future__ import annotations
 
 import datetime
 from typing import TYPE_CHECKING
+from typing import Annotated
 
+from fastapi import Depends
 from fastapi import FastAPI
 from fastapi import HTTPException
 from fastapi import Request
 from fastapi import status
 from fastapi.responses import HTMLResponse
 from fastapi.templating import Jinja2Templates
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from logic.game_logic import CacheSecretLogic
-from logic.game_logic import VectorLogic
+from common import tables
+from logic.auth_logic import AuthLogic
 from logic.user_logic import UserLogic
 
 templates = Jinja2Templates(directory="templates")
 
 if TYPE_CHECKING:
     from typing import Any
+    from typing import AsyncIterator
+
+    from logic.game_logic import GameContext
 
 
 def get_date(delta: datetime.timedelta) -> datetime.date:
     return datetime.datetime.now(datetime.UTC).date() - delta
 
 
-# TODO: replace this with a dependency
-async def get_logics(
-    app: FastAPI, delta: datetime.timedelta = datetime.timedelta()
-) -> tuple[VectorLogic, CacheSecretLogic]:
-    delta += app.state.days_delta
-    date = get_date(delta)
-    logic = VectorLogic(app.state.session, dt=date, model=app.state.model)
-    secret = await logic.secret_logic.get_secret()
-    cache_logic = CacheSecretLogic(
-        app.state.session,
-        secret=secret,
-        dt=date,
-        model=app.state.model,
-    )
-    return logic, cache_logic
-
-
-def super_admin(request: Request) -> None:
-    user = request.state.user
+async def get_db_session(request: Request) -> AsyncIterator[AsyncSession]:
+    async with AsyncSession(request.app.state.engine) as session:
+        yield session
+
+
+DBSession = Annotated[AsyncSession, Depends(get_db_session)]
+
+
+async def get_game_context(app: FastAPI) -> GameContext:
+    game_context: GameContext = await app.state.game_contexts.get_context()
+    return game_context
+
+
+def client_supports(request: Request, version: str) -> bool:
+    """Whether the client's `X-SH-Version` is `version` or later."""
+    return request.headers.get("X-SH-Version", "") >= version
+
+
+async def resolve_user(request: Request) -> tables.User | None:
+    """The user of the `access_token` cookie, looked up on the first call only.
+
+    Routes that need the user declare it with `Depends(resolve_user)`, which
+    also sets `request.state.user` and the subscription state of templates.
+    Other requests never decode the token, nor touch the DB.
+    """
+    try:
+        user: tables.User | None = request.state.user
+        return user
+    except AttributeError:
+        request.state.user = None
+    access_token = request.cookies.get("access_token")
+    if access_token is None:
+        return None
+    # both cached, so that a returning user is identified without crypto or DB
+    payload = await AuthLogic.decode_token(access_token)
+    if payload is None:
+        return None
+    async with AsyncSession(request.app.state.engine) as session:
+        user = await UserLogic(session).get_user(payload["sub"])
+    if user is not None:
+        request.state.user = user
+        if expiry := UserLogic.get_subscription_expiry(user):
+            request.state.has_active_subscription = True
+            request.state.expires_at = str(expiry.date())
+    return user
+
+
+async def super_admin(request: Request) -> None:
+    user = await resolve_user(request)
     if not user or not UserLogic.has_permissions(user, UserLogic.SUPER_ADMIN):
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN)
 
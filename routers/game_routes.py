@@ -2,6 +2,7 @@
 from __future__ import annotations
 
 from fastapi import APIRouter
+from fastapi import Depends
 from fastapi import HTTPException
 from fastapi import Query
 from fastapi import Request
@@ -12,28 +13,36 @@ from common.error import HSError
 from logic.game_logic import EasterEggLogic
 from logic.user_logic import UserClueLogic
 from logic.user_logic import UserHistoryLogic
-from routers.base import get_date
-from routers.base import get_logics
+from routers.base import DBSession
+from routers.base import client_supports
+from routers.base import get_game_context
+from routers.base import resolve_user
 
-game_router = APIRouter()
+game_router = APIRouter(dependencies=[Depends(resolve_user)])
+
+# clients from this version on keep the history, and get only the new guess
+DELTA_HISTORY_VERSION = "2026-10-18"
 
 
 @game_router.get("/api/distance")
 async def distance(
     request: Request,
+    session: DBSession,
     word: str = Query(default=..., min_length=2, max_length=24, regex=r"^[א-ת ']+$"),
 ) -> list[schemas.DistanceResponse]:
     word = word.replace("'", "")
+    # the guess is scored, ranked and saved for the date of this context, even if
+    # the day rolls over meanwhile
+    game_context = await get_game_context(request.app)
     if egg := EasterEggLogic.get_easter_egg(word):
         response = schemas.DistanceResponse(
             guess=word, similarity=99.99, distance=-1, egg=egg
         )
     else:
-        logic, cache_logic = await get_logics(app=request.app)
-        sim = await logic.get_similarity(word)
-        cache_score = await cache_logic.get_cache_score(word)
+        sim, cache_score = game_context.game_table.get_scores(word)
         if cache_score == 1000:
-            solver_count = await logic.get_and_update_solver_count()
+            solver_counter = request.app.state.solver_counter
+            solver_count = await solver_counter.get_rank(game_context.date)
         else:
             solver_count = None
         response = schemas.DistanceResponse(
@@ -44,30 +53,33 @@ async def distance(
         )
     if request.state.user:
         history_logic = UserHistoryLogic(
-            request.app.state.session,
+            session,
             request.state.user,
-            get_date(request.app.state.days_delta),
+            game_context.date,
+            writer=request.app.state.history_writer,
         )
+        if client_supports(request, DELTA_HISTORY_VERSION):
+            return [await history_logic.update_and_get_guess(response)]
         return await history_logic.update_and_get_history(response)
     else:
         return [response]
 
 
 @game_router.get("/api/clue")
-async def get_clue(request: Request) -> dict[str, str]:
+async def get_clue(request: Request, session: DBSession) -> dict[str, str]:
     if not request.state.user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
     else:
-        logic, _ = await get_logics(app=request.app)
         try:
-            secret = await logic.secret_logic.get_secret()
+            game_context = await get_game_context(request.app)
         except HSError:
             raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE)
         user_logic = UserClueLogic(
-            session=request.app.state.session,
+            session=session,
             user=request.state.user,
-            secret=secret,
-            date=get_date(request.app.state.days_delta),
+            secret=game_context.secret,
+            date=game_context.date,
+            hot_clues=game_context.hot_clues,
         )
         try:
             clue = await user_logic.get_clue()
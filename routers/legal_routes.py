@@ -2,14 +2,17 @@
 from __future__ import annotations
 
 from fastapi import APIRouter
+from fastapi import Depends
 from fastapi import Request
 from fastapi.responses import HTMLResponse
 from fastapi.responses import Response
 
 from common import config
 from routers.base import render
+from routers.base import resolve_user
 
-legal_router = APIRouter(prefix="/legal")
+# no ads to subscribers
+legal_router = APIRouter(prefix="/legal", dependencies=[Depends(resolve_user)])
 
 
 @legal_router.get("/privacy", response_class=HTMLResponse, include_in_schema=False)
@@ -7,30 +7,32 @@ import urllib.parse
 from datetime import timedelta
 
 from fastapi import APIRouter
-from fastapi import HTTPException
+from fastapi import Depends
 from fastapi import Request
 from fastapi import Response
-from fastapi import status
 from fastapi.responses import HTMLResponse
 
 from common.consts import FIRST_DATE
 from common.error import HSError
-from logic.game_logic import VectorLogic
+from logic.game_logic import SecretLogic
 from logic.user_logic import UserClueLogic
 from logic.user_logic import UserHistoryLogic
 from logic.user_logic import UserStatisticsLogic
+from routers.base import DBSession
 from routers.base import get_date
-from routers.base import get_logics
+from routers.base import get_game_context
 from routers.base import render
+from routers.base import resolve_user
 from routers.base import super_admin
 
-pages_router = APIRouter()
+# pages show the menu, and no ads to subscribers
+pages_router = APIRouter(dependencies=[Depends(resolve_user)])
 
 
 @pages_router.get("/", response_class=HTMLResponse, include_in_schema=False)
-async def index(request: Request) -> Response:
+async def index(request: Request, session: DBSession) -> Response:
     try:
-        logic, cache_logic = await get_logics(app=request.app)
+        game_context = await get_game_context(request.app)
     except HSError:
         return render(
             name="error.html",
@@ -38,25 +40,26 @@ async def index(request: Request) -> Response:
             error_heading="אוי לא!",
             error_message="אופס, נראה ששכחתי לבחור מילה יומית. נסו שנית מאוחר יותר",
         )
-    cache = await cache_logic.get_cache()
-    closest1 = await logic.get_similarity(cache[-2])
-    closest10 = await logic.get_similarity(cache[-12])
-    closest1000 = await logic.get_similarity(cache[0])
+    cache = game_context.closest1000
+    game_table = game_context.game_table
+    closest1 = game_table.get_similarity(cache[-2])
+    closest10 = game_table.get_similarity(cache[-12])
+    closest1000 = game_table.get_similarity(cache[0])
 
-    date = get_date(delta=request.app.state.days_delta)
+    date = game_context.date
     number = (date - FIRST_DATE).days + 1
 
-    yestersecret = await VectorLogic(
-        session=request.app.state.session,
-        model=request.app.state.model,
+    yestersecret = await SecretLogic(
+        session=session,
         dt=date - timedelta(days=1),
-    ).secret_logic.get_secret()  # TODO: raise a user friendly exception
+    ).get_secret()  # TODO: raise a user friendly exception
 
     if request.state.user:
         history_logic = UserHistoryLogic(
-            request.app.state.session,
+            session,
             request.state.user,
-            get_date(request.app.state.days_delta),
+            date,
+            writer=request.app.state.history_writer,
         )
         history = json.dumps(
             [historia.model_dump() for historia in await history_logic.get_history()]
@@ -70,15 +73,12 @@ async def index(request: Request) -> Response:
     )[0]
 
     if request.state.user:
-        try:
-            secret = await logic.secret_logic.get_secret()
-        except HSError:
-            raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE)
         clue_logic = UserClueLogic(
-            session=request.app.state.session,
+            session=session,
             user=request.state.user,
-            secret=secret,
+            secret=game_context.secret,
             date=date,
+            hot_clues=game_context.hot_clues,
         )
         used_clues = await clue_logic.get_all_clues_used()
     else:
@@ -111,12 +111,14 @@ async def yesterday_top(request: Request) -> Response:
 
 
 @pages_router.get("/secrets", response_class=HTMLResponse)
-async def secrets(request: Request, with_future: bool = False) -> Response:
+async def secrets(
+    request: Request, session: DBSession, with_future: bool = False
+) -> Response:
     if with_future:
-        super_admin(request)
+        await super_admin(request)
 
-    logic, _ = await get_logics(app=request.app)
-    all_secrets = await logic.secret_logic.get_all_secrets(with_future=with_future)
+    logic = SecretLogic(session, dt=get_date(request.app.state.days_delta))
+    all_secrets = await logic.get_all_secrets(with_future=with_future)
 
     return render(
         name="all_secrets.html",
@@ -149,10 +151,10 @@ async def menu(request: Request) -> Response:
 
 
 @pages_router.get("/statistics", response_class=HTMLResponse, include_in_schema=False)
-async def get_statistics(request: Request) -> Response:
+async def get_statistics(request: Request, session: DBSession) -> Response:
     if request.state.user is None:
         statistics = None
     else:
-        logic = UserStatisticsLogic(request.app.state.session, request.state.user)
+        logic = UserStatisticsLogic(session, request.state.user)
         statistics = await logic.get_statistics()
     return render(name="statistics.html", request=request, statistics=statistics)
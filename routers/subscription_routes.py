@@ -14,12 +14,15 @@ from fastapi.requests import Request
 from common import config
 from common import schemas
 from logic.user_logic import UserLogic
+from routers.base import DBSession
 
 subscription_router = APIRouter(prefix="/api/subscribe")
 
 
 @subscription_router.post("/ko-fi")
-async def subscribe(request: Request, data: Annotated[str, Form()]) -> dict[str, str]:
+async def subscribe(
+    request: Request, session: DBSession, data: Annotated[str, Form()]
+) -> dict[str, str]:
     subscription = schemas.Subscription(**json.loads(data))
     is_valid_token = hmac.compare_digest(
         subscription.verification_token, config.kofi_verification_token
@@ -30,7 +33,7 @@ async def subscribe(request: Request, data: Annotated[str, Form()]) -> dict[str,
     ) - datetime.timedelta(minutes=5)
     if not is_valid_token or not is_new_message:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN)
-    logic = UserLogic(session=request.app.state.session)
+    logic = UserLogic(session=session)
     success = await logic.subscribe(subscription)
     success_message = "Success :smile:" if success else "Failed :rage:"
     requests.post(
@@ -5,6 +5,7 @@ import datetime
 import hashlib
 
 from fastapi import APIRouter
+from fastapi import Depends
 from fastapi import HTTPException
 from fastapi import status
 from fastapi.requests import Request
@@ -12,20 +13,23 @@ from fastapi.requests import Request
 from common import config
 from logic.user_logic import UserLogic
 from logic.user_logic import UserStatisticsLogic
+from routers.base import DBSession
+from routers.base import resolve_user
 
-user_router = APIRouter(prefix="/api/user")
+user_router = APIRouter(prefix="/api/user", dependencies=[Depends(resolve_user)])
 
 
 @user_router.get("/info")
 async def get_user_info(
     request: Request,
+    session: DBSession,
 ) -> dict[str, str | datetime.datetime | int | None]:
     user = request.state.user
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
     else:
-        user_logic = UserLogic(request.app.state.session)
-        stats_logic = UserStatisticsLogic(request.app.state.session, user)
+        user_logic = UserLogic(session)
+        stats_logic = UserStatisticsLogic(session, user)
         hasher = hashlib.sha3_256()
         # TODO: make this consistent
         hasher.update(user.email.encode() + config.secret_key.encode())
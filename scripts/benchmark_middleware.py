@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+import argparse
+import asyncio
+import os
+import sys
+import time
+from typing import Awaitable
+from typing import Callable
+
+import httpx
+from fastapi import Request
+from fastapi import Response
+from fastapi import status
+from fastapi.responses import JSONResponse
+from starlette.middleware import Middleware
+from starlette.middleware.base import BaseHTTPMiddleware
+
+base = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+sys.path.extend([base])
+os.chdir(base)
+
+from app import app
+from app import get_rate_limiter
+from common.error import HSError
+from common.middleware import get_idenitifier
+
+CallNext = Callable[[Request], Awaitable[Response]]
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Benchmark /api/distance with pure ASGI and BaseHTTPMiddleware"
+    )
+    parser.add_argument("--requests", type=int, default=5000, help="Requests per run")
+    parser.add_argument("--concurrency", type=int, default=16, help="Open requests")
+    parser.add_argument("--word", default="שלום", help="Guess to send")
+    return parser.parse_args()
+
+
+async def is_limited(request: Request, call_next: CallNext) -> Response:
+    identifier = get_idenitifier(request)
+    if await request.app.state.rate_limiter.is_limited(request.url.path, identifier):
+        return JSONResponse(content="", status_code=status.HTTP_429_TOO_MANY_REQUESTS)
+    return await call_next(request)
+
+
+async def catch_known_errors(request: Request, call_next: CallNext) -> Response:
+    try:
+        return await call_next(request)
+    except HSError as e:
+        return JSONResponse(content=str(e), status_code=status.HTTP_400_BAD_REQUEST)
+
+
+async def benchmark(name: str, args: argparse.Namespace) -> None:
+    # rebuilt with the current middleware on the next request
+    app.middleware_stack = None
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+        params = {"word": args.word}
+        response = await client.get("/api/distance", params=params)
+        response.raise_for_status()
+
+        remaining = args.requests
+
+        async def worker() -> None:
+            nonlocal remaining
+            while remaining > 0:
+                remaining -= 1
+                (await client.get("/api/distance", params=params)).raise_for_status()
+
+        start = time.perf_counter()
+        await asyncio.gather(*[worker() for _ in range(args.concurrency)])
+        total = time.perf_counter() - start
+    print(f"{name}: {args.requests / total:,.0f} requests/s")
+
+
+async def main() -> None:
+    args = parse_args()
+    # the budget is not what is measured
+    app.state.rate_limiter = get_rate_limiter(limit=10**9, period=1)
+    asgi_middleware = app.user_middleware
+    app.user_middleware = [
+        Middleware(BaseHTTPMiddleware, dispatch=dispatch)
+        for dispatch in (catch_known_errors, is_limited)
+    ]
+    await benchmark("BaseHTTPMiddleware", args)
+    app.user_middleware = asgi_middleware
+    await benchmark("pure ASGI", args)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,55 @@
+#!/usr/bin/env python
+import argparse
+import os
+import sys
+import time
+
+base = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+sys.path.extend([base])
+
+from common.rate_limiter import RateLimiter
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the rate limiter")
+    parser.add_argument("--keys", type=int, default=100_000, help="Distinct keys")
+    parser.add_argument("--rounds", type=int, default=5, help="Requests per key")
+    return parser.parse_args()
+
+
+def benchmark(name: str, limiter: RateLimiter, keys: list[str], rounds: int) -> None:
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for key in keys:
+            before = time.perf_counter_ns()
+            limiter.is_limited_locally(key)
+            latencies.append(time.perf_counter_ns() - before)
+    total = time.perf_counter() - start
+    latencies.sort()
+    print(
+        f"{name}: {len(latencies) / total:,.0f} requests/s, "
+        f"p50 {latencies[len(latencies) // 2]}ns, "
+        f"p99 {latencies[len(latencies) * 99 // 100]}ns, "
+        f"max {latencies[-1] / 1000:,.0f}us, "
+        f"{len(limiter):,} keys tracked, {limiter.evictions:,} evictions"
+    )
+
+
+def main() -> None:
+    args = parse_args()
+    keys = [f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}" for i in range(args.keys)]
+    benchmark("all keys tracked", RateLimiter(500, 400, max_keys=args.keys), keys, 1)
+    benchmark(
+        "repeat visits", RateLimiter(500, 400, max_keys=args.keys), keys, args.rounds
+    )
+    benchmark(
+        "10% of keys tracked",
+        RateLimiter(500, 400, max_keys=args.keys // 10),
+        keys,
+        args.rounds,
+    )
+
+
+if __name__ == "__main__":
+    main()
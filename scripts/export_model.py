@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+from __future__ import annotations
+
+import argparse
+import os
+import subprocess
+import sys
+
+base = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+sys.path.extend([base])
+
+from common.session import FLAT_VECTORS_PATH  # noqa: E402
+from common.session import FLAT_VOCAB_PATH  # noqa: E402
+from common.session import MODEL_PATH  # noqa: E402
+from common.session import get_pickled_model  # noqa: E402
+
+# Runs in a fresh interpreter so each format is measured without the other's pages.
+# Private (anonymous) memory is paid by every worker, file-backed memory is shared.
+MEASURE_SNIPPET = """
+import asyncio, sys, time
+sys.path.append({base!r})
+import gensim.models.keyedvectors as word2vec
+from model import GensimModel
+
+def rss():
+    with open("/proc/self/status") as status:
+        fields = dict(line.split(":", 1) for line in status)
+    return [int(fields[name].split()[0]) for name in ("RssAnon", "RssFile")]
+
+before = rss()
+start = time.perf_counter()
+{load}
+seconds = time.perf_counter() - start
+asyncio.run(model.get_all_similarities(model.model.vectors[0]))
+after = rss()
+print(seconds, after[0] - before[0], after[1] - before[1])
+"""
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Export the model to a flat, memory-mappable format"
+    )
+    parser.add_argument("--model", default=MODEL_PATH, help="Pickled gensim model")
+    parser.add_argument("--vectors", default=FLAT_VECTORS_PATH, help="Output matrix")
+    parser.add_argument("--vocab", default=FLAT_VOCAB_PATH, help="Output vocabulary")
+    parser.add_argument(
+        "--no-compare",
+        action="store_true",
+        help="Skip comparing startup time and memory of both formats",
+    )
+    return parser.parse_args()
+
+
+def measure(load: str) -> tuple[float, int, int]:
+    output = subprocess.run(
+        [sys.executable, "-c", MEASURE_SNIPPET.format(base=base, load=load)],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    seconds, private_kb, shared_kb = output.split()
+    return float(seconds), int(private_kb), int(shared_kb)
+
+
+def main() -> None:
+    args = parse_args()
+    model = get_pickled_model(args.model)
+    model.export_flat(args.vectors, args.vocab)
+    print(f"Exported {len(model.model.index_to_key)} words to {args.vectors}")
+    if args.no_compare:
+        return
+
+    loaders = {
+        "pickle": f"model = GensimModel(word2vec.KeyedVectors.load({args.model!r}).wv)",
+        "mmap": f"model = GensimModel.from_flat({args.vectors!r}, {args.vocab!r})",
+    }
+    print("Startup time and RSS growth after loading and scanning all vectors:")
+    for name, load in loaders.items():
+        seconds, private_kb, shared_kb = measure(load)
+        print(
+            f"{name:>6}: {seconds:.3f}s, "
+            f"private {private_kb / 1024:.1f}MB, shared {shared_kb / 1024:.1f}MB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -47,12 +47,12 @@ async def main() -> None:
     cache = await cache_logic.get_cache()
     print(f"found cache of {len(cache)} for {date} with secret {secret}")
 
-    with hs_transaction(session) as session:
+    async with hs_transaction(session) as session:
         query = select(tables.UserHistory)
         query = query.where(tables.UserHistory.game_date == date)
         query = query.where(tables.UserHistory.guess.in_(cache))  # type: ignore[attr-defined]
         query = query.where(tables.UserHistory.distance == -1)
-        histories = session.exec(query).all()
+        histories = (await session.exec(query)).all()
         hist_to_guess = {hist.id: hist.guess for hist in histories}
 
     print(f"Found {len(hist_to_guess)} histories to update")
@@ -67,12 +67,12 @@ async def main() -> None:
 
     print(hist_id_to_cache_and_solver_count)
 
-    with hs_transaction(session) as session:
+    async with hs_transaction(session) as session:
         query = select(tables.UserHistory)
         query = query.where(
             tables.UserHistory.id.in_(hist_id_to_cache_and_solver_count.keys())  # type: ignore[attr-defined]
         )
-        histories = session.exec(query).all()
+        histories = (await session.exec(query)).all()
 
         for history in tqdm.tqdm(histories):
             distance, solver_count = hist_id_to_cache_and_solver_count[history.id]
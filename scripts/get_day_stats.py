@@ -57,7 +57,7 @@ async def main() -> None:
         secret=secret,
         date=args.date,
     )
-    clues = clue_logic.clues
+    clues = await clue_logic.get_clues()
 
     print(f"Word for {args.date}: {secret}")
     print(f"{cache_len} cached words and {len(clues)} clues")
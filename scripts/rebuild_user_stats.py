@@ -0,0 +1,44 @@
+#!/usr/bin/env python
+import argparse
+import asyncio
+import os
+import sys
+
+import tqdm
+
+base = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+sys.path.extend([base])
+
+from sqlmodel import select
+
+from common import tables
+from common.session import get_session
+from common.session import hs_transaction
+from logic.user_logic import UserStatisticsLogic
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Recompute users' statistics from their guess history"
+    )
+    parser.add_argument("--email", type=str, help="Only rebuild this user's stats")
+    return parser.parse_args()
+
+
+async def main() -> None:
+    args = parse_args()
+    session = get_session()
+
+    async with hs_transaction(session, expire_on_commit=False) as session:
+        query = select(tables.User)
+        if args.email:
+            query = query.where(tables.User.email == args.email)
+        users = (await session.exec(query)).all()
+
+    for user in tqdm.tqdm(users):
+        await UserStatisticsLogic(session, user).rebuild()
+    print(f"Rebuilt statistics of {len(users)} users")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
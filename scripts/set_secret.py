@@ -4,7 +4,6 @@ from __future__ import annotations
 import asyncio
 import datetime
 import os
-import random
 import sys
 from argparse import ArgumentParser
 from argparse import ArgumentTypeError
@@ -22,7 +21,7 @@ from common.session import hs_transaction  # noqa: E402
 from logic.game_logic import CacheSecretLogic  # noqa: E402
 
 if TYPE_CHECKING:
-    from sqlmodel import Session
+    from sqlmodel.ext.asyncio.session import AsyncSession
 
     from model import GensimModel
 
@@ -89,11 +88,11 @@ async def main() -> None:
         secret = await get_random_word(model, args.top_sample)
 
 
-async def get_date(session: Session) -> datetime.date:
+async def get_date(session: AsyncSession) -> datetime.date:
     query = select(tables.SecretWord.game_date)  # type: ignore
     query = query.order_by(tables.SecretWord.game_date.desc())  # type: ignore
-    with hs_transaction(session) as s:
-        latest: datetime.date = s.exec(query).first()
+    async with hs_transaction(session) as s:
+        latest: datetime.date = (await s.exec(query)).first()
 
     dt = latest + datetime.timedelta(days=1)
     print(f"Now doing {dt}")
@@ -101,7 +100,7 @@ async def get_date(session: Session) -> datetime.date:
 
 
 async def do_populate(
-    session: Session,
+    session: AsyncSession,
     secret: str,
     date: datetime.date,
     model: GensimModel,
@@ -140,10 +139,7 @@ async def do_populate(
 
 async def get_random_word(model: GensimModel, top_sample: int | None) -> str:
     while True:
-        if top_sample is None:
-            top_sample = len(model.model.index_to_key)
-        rand_index = random.randint(0, top_sample)
-        if best_secret := get_best_secret(model.model.index_to_key[rand_index]):
+        if best_secret := get_best_secret(model.get_random_word(top_sample)):
             return best_secret
 
 
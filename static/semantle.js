@@ -215,7 +215,8 @@ let Semantle = (function() {
             return [cached];
         }
         const url = "/api/distance" + '?word=' + word;
-        const response = await fetch(url, {headers: new Headers({'X-SH-Version': "2023-09-10"})});
+        // the guess history is loaded with the page, only the new guess is returned
+        const response = await fetch(url, {headers: new Headers({'X-SH-Version': "2026-10-18"})});
         try {
             if (response.status === 200) {
                 return await response.json();
@@ -0,0 +1,83 @@
+import time
+import unittest
+from unittest import mock
+
+import jwt
+
+from common import config
+from common.backend import LocalBackend
+from logic.auth_logic import TokenCache
+
+
+class TestTokenCache(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self.now = time.time()
+        self.backend = LocalBackend()
+        self.testee = self.make_cache()
+        self.token = self.make_token(expires_in=60 * 60)
+
+    def make_cache(self) -> TokenCache:
+        return TokenCache(ttl=5 * 60, backend=self.backend, timer=lambda: self.now)
+
+    def make_token(self, expires_in: float) -> str:
+        return jwt.encode(
+            {"sub": "test@test.com", "exp": int(self.now + expires_in)},
+            key=config.jwt_key,
+            algorithm=config.jwt_algorithm,
+        )
+
+    async def test_decode(self) -> None:
+        # arrange
+        with mock.patch("jwt.decode", wraps=jwt.decode) as decode:
+            # act
+            claims = [await self.testee.decode(self.token) for _ in range(3)]
+
+        # assert
+        expected = {"sub": "test@test.com", "exp": int(self.now + 60 * 60)}
+        self.assertEqual(1, decode.call_count)
+        self.assertEqual([expected] * 3, claims)
+
+    async def test_decode__verified_again_after_ttl(self) -> None:
+        # arrange
+        await self.testee.decode(self.token)
+
+        # act
+        self.now += 5 * 60
+        with mock.patch("jwt.decode", wraps=jwt.decode) as decode:
+            claims = await self.testee.decode(self.token)
+
+        # assert
+        self.assertEqual(1, decode.call_count)
+        self.assertIsNotNone(claims)
+
+    async def test_decode__not_cached_past_exp(self) -> None:
+        # arrange
+        token = self.make_token(expires_in=60)
+        await self.testee.decode(token)
+
+        # act
+        self.now += 60
+        # as PyJWT would, by its own clock, once the token expired
+        expired = jwt.exceptions.ExpiredSignatureError("Signature has expired")
+        with mock.patch("jwt.decode", side_effect=expired) as decode:
+            claims = await self.testee.decode(token)
+
+        # assert
+        self.assertEqual(1, decode.call_count)
+        self.assertIsNone(claims)
+
+    async def test_revoke(self) -> None:
+        # arrange
+        other_worker = self.make_cache()
+        await self.testee.decode(self.token)
+        await other_worker.decode(self.token)
+
+        # act
+        await self.testee.revoke(self.token)
+
+        # assert
+        self.assertIsNone(await self.testee.decode(self.token))
+        self.assertIsNotNone(await other_worker.decode(self.token))
+        self.now += 5 * 60
+        self.assertIsNone(await other_worker.decode(self.token))
+        self.assertIsNone(await self.make_cache().decode(self.token))
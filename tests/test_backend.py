@@ -0,0 +1,125 @@
+import asyncio
+import os
+import tempfile
+import unittest
+
+from common.backend import LocalBackend
+from common.backend import SharedBackend
+from common.backend import SqliteBackend
+
+
+class SharedBackendTests:
+    now: float
+    testee: SharedBackend
+
+    async def test_set(self) -> None:
+        # act
+        await self.testee.set("key", "value", ttl=10)
+
+        # assert
+        assert await self.testee.get("key") == "value"
+        assert await self.testee.get("other") is None
+
+    async def test_set__expires(self) -> None:
+        # arrange
+        await self.testee.set("key", "value", ttl=10)
+
+        # act
+        self.now += 10
+
+        # assert
+        assert await self.testee.get("key") is None
+
+    async def test_add(self) -> None:
+        # act
+        added = await self.testee.add("key", "value", ttl=10)
+        readded = await self.testee.add("key", "other", ttl=10)
+        self.now += 10
+        expired = await self.testee.add("key", "other", ttl=10)
+
+        # assert
+        assert [True, False, True] == [added, readded, expired]
+        assert await self.testee.get("key") == "other"
+
+    async def test_delete(self) -> None:
+        # arrange
+        await self.testee.set("key", "value", ttl=10)
+
+        # act
+        await self.testee.delete("key")
+
+        # assert
+        assert await self.testee.get("key") is None
+
+    async def test_is_limited(self) -> None:
+        # act
+        limited = [await self.testee.is_limited("key", 2, 10) for _ in range(3)]
+        self.now += 5
+        refilled = await self.testee.is_limited("key", 2, 10)
+
+        # assert
+        assert [False, False, True] == limited
+        assert refilled is False
+        assert await self.testee.is_limited("other", 2, 10) is False
+
+
+class TestLocalBackend(SharedBackendTests, unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.now = 0.0
+        self.testee = LocalBackend(timer=lambda: self.now)
+
+
+class TestSqliteBackend(SharedBackendTests, unittest.IsolatedAsyncioTestCase):
+    testee: SqliteBackend
+
+    async def asyncSetUp(self) -> None:
+        self.now = 1000.0
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "shared.sqlite")
+        self.testee = SqliteBackend(self.path, timer=lambda: self.now)
+
+    async def test_is_limited__across_workers(self) -> None:
+        # arrange
+        workers = [SqliteBackend(self.path, timer=lambda: self.now) for _ in range(4)]
+
+        # act
+        limited = await asyncio.gather(
+            *[worker.is_limited("key", 10, 10) for worker in workers * 5]
+        )
+
+        # assert
+        self.assertEqual(10, limited.count(True))
+
+    async def test_is_limited__as_local_backend(self) -> None:
+        # arrange
+        local = LocalBackend(timer=lambda: self.now)
+        steps = [0, 0, 0, 0, 1.5, 0, 0.5, 2, 0, 0, 0, 7, 0]
+
+        # act
+        limited, expected = [], []
+        for step in steps:
+            self.now += step
+            limited.append(await self.testee.is_limited("key", 3, 6))
+            expected.append(await local.is_limited("key", 3, 6))
+
+        # assert
+        self.assertEqual(expected, limited)
+        self.assertIn(True, limited)
+
+    async def test_cleanup(self) -> None:
+        # arrange
+        self.testee.CLEANUP_EVERY = 3
+        await self.testee.set("key", "value", ttl=10)
+        await self.testee.is_limited("key", 2, 10)
+        self.now += 10
+
+        # act
+        await self.testee.set("other", "value", ttl=10)
+
+        # assert
+        rows = self.testee._connect().execute(
+            "SELECT (SELECT count(*) FROM shared_value), "
+            "(SELECT count(*) FROM shared_bucket)"
+        )
+        self.assertEqual((1, 0), rows.fetchone())
@@ -0,0 +1,161 @@
+import asyncio
+import unittest
+
+import pytest
+
+from common.backend import LocalBackend
+from common.cache import AsyncTTLCache
+from common.cache import LRUCache
+
+
+class TestAsyncTTLCache(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.now = 0.0
+        self.loads = 0
+        self.testee: AsyncTTLCache[str, str | None] = AsyncTTLCache(
+            ttl=10, maxsize=2, timer=lambda: self.now
+        )
+
+    async def load(self, value: str | None = "value") -> str | None:
+        self.loads += 1
+        await asyncio.sleep(0)
+        return value
+
+    async def test_get__single_flight(self) -> None:
+        # act
+        values = await asyncio.gather(
+            *[self.testee.get("key", self.load) for _ in range(10)]
+        )
+
+        # assert
+        self.assertEqual(["value"] * 10, values)
+        self.assertEqual(1, self.loads)
+
+    async def test_get__expires(self) -> None:
+        # arrange
+        await self.testee.get("key", self.load)
+        self.now = 9.9
+        await self.testee.get("key", self.load)
+
+        # act
+        self.now = 10
+        await self.testee.get("key", self.load)
+
+        # assert
+        self.assertEqual(2, self.loads)
+
+    async def test_get__evicts_least_recently_used(self) -> None:
+        # arrange
+        await self.testee.get("a", self.load)
+        await self.testee.get("b", self.load)
+        await self.testee.get("a", self.load)
+
+        # act
+        await self.testee.get("c", self.load)
+
+        # assert
+        self.assertEqual(2, len(self.testee))
+        await self.testee.get("a", self.load)
+        self.assertEqual(3, self.loads)
+        await self.testee.get("b", self.load)
+        self.assertEqual(4, self.loads)
+
+    async def test_get__does_not_cache_errors_and_none(self) -> None:
+        # arrange
+        async def fail() -> str:
+            raise ValueError()
+
+        with pytest.raises(ValueError):
+            await self.testee.get("key", fail)
+        await self.testee.get("key", lambda: self.load(None))
+
+        # act
+        value = await self.testee.get("key", self.load)
+
+        # assert
+        self.assertEqual("value", value)
+        self.assertEqual(2, self.loads)
+
+    async def test_invalidate__during_load(self) -> None:
+        # arrange
+        stale = asyncio.ensure_future(self.testee.get("key", self.load))
+        await asyncio.sleep(0)
+
+        # act
+        await self.testee.invalidate("key")
+        await stale
+        value = await self.testee.get("key", lambda: self.load("fresh"))
+
+        # assert
+        self.assertEqual("fresh", value)
+
+    async def test_get__shared_backend(self) -> None:
+        # arrange
+        backend = LocalBackend()
+        workers: list[AsyncTTLCache[str, str | None]] = [
+            AsyncTTLCache(ttl=10, maxsize=2, backend=backend, name="test")
+            for _ in range(2)
+        ]
+        await workers[0].get("key", self.load)
+
+        # act
+        value = await workers[1].get("key", self.load)
+        await workers[0].invalidate("key")
+        workers[1].clear()
+        fresh = await workers[1].get("key", lambda: self.load("fresh"))
+
+        # assert
+        self.assertEqual("value", value)
+        self.assertEqual("fresh", fresh)
+        self.assertEqual(2, self.loads)
+
+
+class TestLRUCache(unittest.TestCase):
+    def setUp(self) -> None:
+        self.testee: LRUCache[str, str] = LRUCache(
+            maxsize=2, pinned=lambda key: key == "pinned"
+        )
+
+    def test_set__evicts_least_recently_used(self) -> None:
+        # arrange
+        self.testee.set("a", "a")
+        self.testee.set("b", "b")
+        self.testee.get("a")
+
+        # act
+        self.testee.set("c", "c")
+
+        # assert
+        self.assertNotIn("b", self.testee)
+        self.assertEqual("a", self.testee.get("a"))
+        self.assertIsNone(self.testee.get("b"))
+        self.assertEqual(
+            {"size": 2, "hits": 2, "misses": 1, "evictions": 1},
+            {k: v for k, v in self.testee.stats.items() if k != "bytes"},
+        )
+
+    def test_set__never_evicts_pinned(self) -> None:
+        # arrange
+        self.testee.set("pinned", "value")
+
+        # act
+        for key in "abcde":
+            self.testee.set(key, key)
+
+        # assert
+        self.assertEqual("value", self.testee.get("pinned"))
+        self.assertIn("e", self.testee)
+        self.assertEqual(2, len(self.testee))
+
+    def test_set__bounds_bytes(self) -> None:
+        # arrange
+        testee: LRUCache[str, list[str]] = LRUCache(maxsize=10, maxbytes=2600)
+        value = ["x" * 100] * 5
+
+        # act
+        for key in "abcde":
+            testee.set(key, value)
+
+        # assert
+        self.assertLessEqual(testee.nbytes, 2600)
+        self.assertEqual(["c", "d", "e"], [key for key in "abcde" if key in testee])
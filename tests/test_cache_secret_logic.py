@@ -0,0 +1,81 @@
+import datetime
+import unittest
+
+from logic.game_logic import CacheSecretLogic
+from logic.game_logic import SecretLogic
+from logic.game_logic import VectorLogic
+from mock.mock_db import MockDb
+from mock.mock_model import make_model
+
+
+class TestCacheSecretLogic(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        CacheSecretLogic._cache_dict.clear()
+        CacheSecretLogic._game_tables.clear()
+        VectorLogic._secret_cache.clear()
+        SecretLogic._secrets.clear()
+        self.db = await MockDb.create()
+        self.model = make_model()
+        self.date = datetime.date(2021, 1, 1)
+        self.secret = self.model.model.index_to_key[7]
+        logic = CacheSecretLogic(
+            self.db.session, secret=self.secret, dt=self.date, model=self.model
+        )
+        await logic.simulate_set_secret()
+        await logic.do_populate(clues=[])
+        CacheSecretLogic._cache_dict.clear()
+        self.testee = CacheSecretLogic(
+            self.db.session, secret=self.secret, dt=self.date, model=self.model
+        )
+
+    async def test_simulate_set_secret__matches_full_scan(self) -> None:
+        # arrange
+        secret_vector = self.model.model[self.secret]
+        scored = []
+        async for word, vector in self.model.iterate_all():
+            scored.append(
+                (await self.model.calc_similarity(vector, secret_vector), word)
+            )
+        expected = [word for _, word in sorted(scored)[-1000:]]
+
+        # act
+        cache = await self.testee.get_cache()
+
+        # assert
+        self.assertEqual(expected, cache)
+
+    async def test_game_table__close_to_similarity(self) -> None:
+        # arrange
+        vector_logic = VectorLogic(self.db.session, model=self.model, dt=self.date)
+
+        # act
+        game_table = await self.testee.get_game_table()
+
+        # assert
+        # float32 cosines may round either way of a hundredth
+        for word in self.model.model.index_to_key[:1500]:
+            expected = await vector_logic.get_similarity(word)
+            self.assertAlmostEqual(
+                expected, game_table.get_similarity(word), delta=0.01 + 1e-9
+            )
+
+    async def test_game_table__matches_cache(self) -> None:
+        # arrange
+        cache = await self.testee.get_cache()
+
+        # act
+        game_table = await self.testee.get_game_table()
+
+        # assert
+        self.assertEqual(1000, game_table.get_cache_score(self.secret))
+        for word in self.model.model.index_to_key:
+            expected = cache.index(word) + 1 if word in cache else -1
+            self.assertEqual(expected, game_table.get_cache_score(word))
+
+    async def test_game_table__invalid_words(self) -> None:
+        # act
+        game_table = await self.testee.get_game_table()
+
+        # assert
+        for word in ["א", "hello", "שלוםhello", "לאקיים"]:
+            self.assertEqual(-1, game_table.get_cache_score(word))
@@ -0,0 +1,197 @@
+import asyncio
+import datetime
+import unittest
+
+import pytest
+
+from common.backend import LocalBackend
+from common.error import HSError
+from logic.game_logic import CacheSecretLogic
+from logic.game_logic import GameContextLogic
+from logic.game_logic import SecretLogic
+from logic.game_logic import VectorLogic
+from mock.mock_db import MockDb
+from mock.mock_model import make_model
+
+
+class TestGameContextLogic(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        CacheSecretLogic._cache_dict.clear()
+        CacheSecretLogic._game_tables.clear()
+        VectorLogic._secret_cache.clear()
+        SecretLogic._secrets.clear()
+        self.db = await MockDb.create()
+        self.model = make_model()
+        self.today = datetime.datetime.now(datetime.UTC).date()
+        self.secrets = {}
+        for days, index in [(0, 7), (1, 8)]:
+            date = self.today + datetime.timedelta(days=days)
+            self.secrets[date] = self.model.model.index_to_key[index]
+            logic = CacheSecretLogic(
+                self.db.session, secret=self.secrets[date], dt=date, model=self.model
+            )
+            await logic.simulate_set_secret()
+            await logic.do_populate(clues=["קלו"])
+        self.testee = GameContextLogic(self.db.engine, self.model)
+
+    async def test_get_context(self) -> None:
+        # act
+        game_context = await self.testee.get_context()
+
+        # assert
+        self.assertEqual(self.today, game_context.date)
+        self.assertEqual(self.secrets[self.today], game_context.secret)
+        self.assertEqual(self.secrets[self.today], game_context.closest1000[-1])
+        self.assertEqual(
+            1000, game_context.game_table.get_cache_score(game_context.secret)
+        )
+        self.assertEqual(("קלו",), game_context.hot_clues)
+
+    async def test_get_context__built_once(self) -> None:
+        # act
+        contexts = await asyncio.gather(*[self.testee.get_context() for _ in range(10)])
+
+        # assert
+        self.assertEqual(1, len({id(context) for context in contexts}))
+        self.assertIs(contexts[0], await self.testee.get_context())
+
+    async def test_get_context__swapped_on_rollover(self) -> None:
+        # arrange
+        today = await self.testee.get_context()
+        tomorrow_date = self.today + datetime.timedelta(days=1)
+
+        # act
+        self.testee.days_delta = -datetime.timedelta(days=1)
+        tomorrow = await self.testee.get_context()
+
+        # assert
+        self.assertEqual(tomorrow_date, tomorrow.date)
+        self.assertEqual(self.secrets[tomorrow_date], tomorrow.secret)
+        self.assertIs(tomorrow, self.testee.current)
+        self.assertIsNot(today, tomorrow)
+
+    async def test_prewarm(self) -> None:
+        # act
+        prewarmed = await self.testee.prewarm()
+
+        # assert
+        self.assertTrue(self.testee.is_prewarmed())
+        self.testee.days_delta = -datetime.timedelta(days=1)
+        self.assertIs(prewarmed, await self.testee.get_context())
+
+    async def test_prewarm__no_secret(self) -> None:
+        # arrange
+        self.testee.days_delta = -datetime.timedelta(days=1)
+
+        # act & assert
+        with pytest.raises(HSError):
+            await self.testee.prewarm()
+        self.assertFalse(self.testee.is_prewarmed())
+
+    async def test_run_prewarmer__alerts_once_without_secret(self) -> None:
+        # arrange
+        self.testee.days_delta = -datetime.timedelta(days=1)
+        self.testee.PREWARM_RETRY = 0
+        alerts: list[str] = []
+
+        async def alert(text: str) -> None:
+            alerts.append(text)
+
+        # act
+        prewarmer = asyncio.create_task(self.testee.run_prewarmer(alert))
+        for _ in range(50):
+            await asyncio.sleep(0.01)
+        prewarmer.cancel()
+
+        # assert
+        self.assertEqual(1, len(alerts))
+        self.assertFalse(self.testee.is_prewarmed())
+
+    async def test_run_prewarmer__survives_failed_alert(self) -> None:
+        # arrange
+        self.testee.days_delta = -datetime.timedelta(days=1)
+        self.testee.PREWARM_RETRY = 0
+
+        async def alert(text: str) -> None:
+            raise AttributeError("alerts_webhook")
+
+        # act
+        prewarmer = asyncio.create_task(self.testee.run_prewarmer(alert))
+        for _ in range(50):
+            await asyncio.sleep(0.01)
+
+        # assert
+        self.assertFalse(prewarmer.done())
+        prewarmer.cancel()
+
+    async def test_run_prewarmer__single_worker(self) -> None:
+        # arrange
+        backend = LocalBackend()
+        workers = [
+            GameContextLogic(self.db.engine, self.model, backend=backend)
+            for _ in range(3)
+        ]
+
+        async def alert(text: str) -> None:
+            raise AssertionError("Alerted though prewarmed")
+
+        # act
+        prewarmers = [
+            asyncio.create_task(worker.run_prewarmer(alert)) for worker in workers
+        ]
+        for _ in range(20):
+            await asyncio.sleep(0.01)
+
+        # assert
+        for prewarmer in prewarmers:
+            prewarmer.cancel()
+        self.assertEqual(1, sum(worker.is_prewarmed() for worker in workers))
+
+    async def test_run_prewarmer__alerts_once_across_workers(self) -> None:
+        # arrange
+        backend = LocalBackend()
+        workers = [
+            GameContextLogic(
+                self.db.engine,
+                self.model,
+                days_delta=-datetime.timedelta(days=1),
+                backend=backend,
+            )
+            for _ in range(3)
+        ]
+        alerts: list[str] = []
+
+        async def alert(text: str) -> None:
+            alerts.append(text)
+
+        # act
+        prewarmers = [
+            asyncio.create_task(worker.run_prewarmer(alert)) for worker in workers
+        ]
+        for _ in range(20):
+            await asyncio.sleep(0.01)
+
+        # assert
+        for prewarmer in prewarmers:
+            prewarmer.cancel()
+        self.assertEqual(1, len(alerts))
+
+    async def test_init__pins_served_dates(self) -> None:
+        # arrange
+        days_delta = datetime.timedelta(days=5)
+        served = self.today - days_delta
+        dates = [served + datetime.timedelta(days=days) for days in (-1, 0, 1)]
+        GameContextLogic(self.db.engine, self.model, days_delta=days_delta)
+        game_tables = CacheSecretLogic._game_tables
+        for date in dates:
+            game_tables.set(str(date), "table")  # type: ignore[arg-type]
+
+        # act
+        for days in range(1, 2 * game_tables.maxsize):
+            date = self.today + datetime.timedelta(days=days)
+            game_tables.set(str(date), "table")  # type: ignore[arg-type]
+
+        # assert
+        for date in dates:
+            self.assertIn(str(date), game_tables)
+        self.assertNotIn(str(self.today + datetime.timedelta(days=1)), game_tables)
@@ -0,0 +1,79 @@
+import unittest
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from starlette.types import Receive
+from starlette.types import Scope
+from starlette.types import Send
+
+from common.error import HSError
+from common.middleware import KnownErrorsMiddleware
+from common.middleware import RateLimitMiddleware
+from common.rate_limiter import RateLimiter
+from common.rate_limiter import RouteRateLimiter
+
+
+class TestMiddleware(unittest.TestCase):
+    def setUp(self) -> None:
+        self.calls = 0
+        app = FastAPI()
+        app.state.rate_limiter = RouteRateLimiter(RateLimiter(limit=1, period=100))
+
+        @app.get("/error")
+        async def error() -> None:
+            self.calls += 1
+            raise HSError("no such word", code=123)
+
+        @app.get("/count")
+        async def count() -> int:
+            self.calls += 1
+            return self.calls
+
+        app.add_middleware(RateLimitMiddleware)
+        app.add_middleware(KnownErrorsMiddleware)
+        self.client = TestClient(app)
+
+    def test_known_error(self) -> None:
+        # act
+        response = self.client.get("/error")
+
+        # assert
+        self.assertEqual(400, response.status_code)
+        self.assertEqual("Error: no such word (123)", response.json())
+
+    def test_rate_limited(self) -> None:
+        # arrange
+        self.client.get("/count")
+
+        # act
+        response = self.client.get("/count")
+
+        # assert
+        self.assertEqual(429, response.status_code)
+        self.assertEqual(1, self.calls)
+
+
+class TestMiddlewareLifespan(unittest.IsolatedAsyncioTestCase):
+    async def test_lifespan_passes_through(self) -> None:
+        # arrange
+        received: list[Scope] = []
+
+        async def inner(scope: Scope, receive: Receive, send: Send) -> None:
+            received.append(scope)
+
+        async def receive() -> dict[str, str]:
+            raise AssertionError("Received by the middleware")
+
+        async def send(message: object) -> None:
+            raise AssertionError("Sent by the middleware")
+
+        scope = {"type": "lifespan"}
+
+        # act
+        for middleware in (RateLimitMiddleware, KnownErrorsMiddleware):
+            await middleware(inner)(scope, receive, send)
+
+        # assert
+        self.assertEqual(2, len(received))
+        self.assertIs(scope, received[0])
+        self.assertIs(scope, received[1])
@@ -0,0 +1,52 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from mock.mock_model import make_model
+from model import GensimModel
+
+
+class TestGensimModel(unittest.IsolatedAsyncioTestCase):
+    async def test_from_flat(self) -> None:
+        # arrange
+        model = make_model()
+        with tempfile.TemporaryDirectory() as directory:
+            vectors_path = os.path.join(directory, "model.npy")
+            vocab_path = os.path.join(directory, "model.vocab")
+            model.export_flat(vectors_path, vocab_path)
+
+            # act
+            flat = GensimModel.from_flat(vectors_path, vocab_path)
+
+            # assert
+            self.assertIsInstance(flat.model.vectors, np.memmap)
+            self.assertEqual(model.model.index_to_key, flat.model.index_to_key)
+            secret = model.model["אבג"]
+            np.testing.assert_allclose(
+                await model.get_all_similarities(secret),
+                await flat.get_all_similarities(secret),
+                atol=0.011,
+            )
+            self.assertEqual(
+                await model.get_closest(secret, topn=10),
+                await flat.get_closest(secret, topn=10),
+            )
+            del flat
+
+    async def test_vocabulary_index(self) -> None:
+        # arrange
+        model = make_model()
+
+        # act
+        words = [word async for word, _ in model.iterate_all()]
+
+        # assert
+        self.assertEqual(1500, len(words))
+        self.assertEqual(len(words), len(model.playable_rows))
+        for word in ["א", "hello", "שלוםhello", "לאקיים"]:
+            self.assertIsNone(model.get_index(word))
+            self.assertIsNone(await model.get_vector(word))
+        self.assertEqual(model.model.get_index("אבג"), model.get_index("אבג"))
+        self.assertIn(model.get_random_word(top_sample=10), words[:10])
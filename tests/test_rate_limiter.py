@@ -0,0 +1,88 @@
+import unittest
+
+from common.backend import LocalBackend
+from common.rate_limiter import RateLimiter
+from common.rate_limiter import RouteRateLimiter
+
+
+class TestRateLimiter(unittest.TestCase):
+    def setUp(self) -> None:
+        self.now = 0.0
+        self.testee = RateLimiter(
+            limit=3, period=30, max_keys=2, timer=lambda: self.now
+        )
+
+    def test_is_limited(self) -> None:
+        # act
+        limited = [self.testee.is_limited_locally("key") for _ in range(4)]
+
+        # assert
+        self.assertEqual([False, False, False, True], limited)
+        self.assertFalse(self.testee.is_limited_locally("other"))
+
+    def test_is_limited__refills(self) -> None:
+        # arrange
+        for _ in range(4):
+            self.testee.is_limited_locally("key")
+
+        # act
+        self.now = 9.9
+        still_limited = self.testee.is_limited_locally("key")
+        self.now = 15
+        refilled = self.testee.is_limited_locally("key")
+
+        # assert
+        self.assertTrue(still_limited)
+        self.assertFalse(refilled)
+        self.assertTrue(self.testee.is_limited_locally("key"))
+
+    def test_is_limited__evicts_least_recently_used(self) -> None:
+        # arrange
+        for key in ["a", "a", "a", "b", "a"]:
+            self.testee.is_limited_locally(key)
+
+        # act
+        self.testee.is_limited_locally("c")
+
+        # assert
+        self.assertEqual(2, len(self.testee))
+        self.assertEqual(1, self.testee.evictions)
+        self.assertTrue(self.testee.is_limited_locally("a"))
+        self.assertFalse(self.testee.is_limited_locally("b"))
+
+
+class TestRouteRateLimiter(unittest.IsolatedAsyncioTestCase):
+    async def test_is_limited__budget_per_route(self) -> None:
+        # arrange
+        testee = RouteRateLimiter(
+            default=RateLimiter(limit=1, period=10),
+            routes={
+                "/api/": RateLimiter(limit=1, period=10),
+                "/api/distance": RateLimiter(limit=2, period=10),
+            },
+        )
+
+        # act
+        limited = [
+            await testee.is_limited(path, "key")
+            for path in ["/", "/", "/api/distance", "/api/distance", "/api/clue"]
+        ]
+
+        # assert
+        self.assertEqual([False, True, False, False, False], limited)
+        self.assertTrue(await testee.is_limited("/api/distance", "key"))
+
+    async def test_is_limited__shared_backend(self) -> None:
+        # arrange
+        backend = LocalBackend()
+        workers = [
+            RateLimiter(limit=2, period=10, backend=backend, name="default")
+            for _ in range(2)
+        ]
+
+        # act
+        limited = [await worker.is_limited("key") for worker in workers * 2]
+
+        # assert
+        self.assertEqual([False, False, True, True], limited)
+        self.assertEqual(0, len(workers[0]))
@@ -0,0 +1,87 @@
+import datetime
+import unittest
+
+from logic.game_logic import CacheSecretLogic
+from logic.game_logic import GameContextLogic
+from logic.game_logic import SecretChanges
+from logic.game_logic import SecretLogic
+from logic.game_logic import VectorLogic
+from mock.mock_db import MockDb
+from mock.mock_model import make_model
+
+
+class TestSecretChanges(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        CacheSecretLogic._cache_dict.clear()
+        CacheSecretLogic._game_tables.clear()
+        VectorLogic._secret_cache.clear()
+        SecretLogic._secrets.clear()
+        self.db = await MockDb.create()
+        self.model = make_model()
+        self.today = datetime.datetime.now(datetime.UTC).date()
+        await self.set_secret(self.today, index=7, clues=["קלו"])
+        self.testee = SecretChanges(self.db.engine)
+        self.invalidated: list[datetime.date] = []
+        self.testee.subscribe(self.invalidate)
+
+    async def invalidate(self, date: datetime.date) -> None:
+        self.invalidated.append(date)
+
+    async def set_secret(
+        self, date: datetime.date, index: int, clues: list[str]
+    ) -> str:
+        secret: str = self.model.model.index_to_key[index]
+        logic = CacheSecretLogic(
+            self.db.session, secret=secret, dt=date, model=self.model
+        )
+        await logic.simulate_set_secret(force=True)
+        await logic.do_populate(clues=clues)
+        return secret
+
+    async def test_poll(self) -> None:
+        # arrange
+        await self.testee.poll()
+        tomorrow = self.today + datetime.timedelta(days=1)
+        await self.set_secret(tomorrow, index=8, clues=[])
+
+        # act
+        dates = await self.testee.poll()
+
+        # assert
+        self.assertEqual([tomorrow], dates)
+        self.assertEqual([tomorrow], self.invalidated)
+        self.assertEqual([], await self.testee.poll())
+
+    async def test_poll__ignores_changes_before_first_poll(self) -> None:
+        # act
+        dates = await self.testee.poll()
+
+        # assert
+        self.assertEqual([], dates)
+        self.assertEqual([], self.invalidated)
+
+    async def test_poll__rewritten_secret_served_by_other_worker(self) -> None:
+        # arrange
+        game_contexts = GameContextLogic(self.db.engine, self.model)
+        for invalidate in (
+            SecretLogic.invalidate,
+            VectorLogic.invalidate,
+            CacheSecretLogic.invalidate,
+            game_contexts.invalidate,
+        ):
+            self.testee.subscribe(invalidate)
+        await self.testee.poll()
+        before = await game_contexts.get_context()
+        # as if by the admin of another worker, whose caches are its own
+        rewritten = await self.set_secret(self.today, index=9, clues=["אחר"])
+        self.assertIs(before, await game_contexts.get_context())
+
+        # act
+        await self.testee.poll()
+        after = await game_contexts.get_context()
+
+        # assert
+        self.assertEqual(rewritten, after.secret)
+        self.assertEqual(rewritten, after.closest1000[-1])
+        self.assertEqual(1000, after.game_table.get_cache_score(rewritten))
+        self.assertEqual(("אחר",), after.hot_clues)
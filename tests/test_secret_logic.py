@@ -2,7 +2,7 @@ import datetime
 import unittest
 
 import pytest
-from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from common import tables
 from common.error import HSError
@@ -12,7 +12,8 @@ from mock.mock_db import MockDb
 
 class TestGameLogic(unittest.IsolatedAsyncioTestCase):
     async def asyncSetUp(self) -> None:
-        self.db = MockDb()
+        SecretLogic._secrets.clear()
+        self.db = await MockDb.create()
         self.date = datetime.date(2021, 1, 1)
         self.testee = SecretLogic(session=self.db.session, dt=self.date)
 
@@ -24,7 +25,7 @@ class TestGameLogic(unittest.IsolatedAsyncioTestCase):
     async def test_get_secret(self) -> None:
         # arrange
         db_secret = tables.SecretWord(word="test", game_date=self.date)
-        self.db.add(db_secret)
+        await self.db.add(db_secret)
 
         # act
         secret = await self.testee.get_secret()
@@ -34,14 +35,16 @@ class TestGameLogic(unittest.IsolatedAsyncioTestCase):
 
     async def test_get_secret__cache(self) -> None:
         # arrange
-        cached = self.db.add(tables.SecretWord(word="cached", game_date=self.date))
+        cached = await self.db.add(
+            tables.SecretWord(word="cached", game_date=self.date)
+        )
         await self.testee.get_secret()
-        with Session(self.db.engine) as session:
-            db_secret = session.get(tables.SecretWord, cached.id)
+        async with AsyncSession(self.db.engine) as session:
+            db_secret = await session.get(tables.SecretWord, cached.id)
             assert db_secret is not None
             db_secret.word = "not_cached"
             session.add(db_secret)
-            session.commit()
+            await session.commit()
 
         # act
         secret = await self.testee.get_secret()
@@ -55,7 +58,7 @@ class TestGameLogic(unittest.IsolatedAsyncioTestCase):
             await self.testee.get_secret()
         except HSError:
             pass
-        self.db.add(tables.SecretWord(word="not_cached", game_date=self.date))
+        await self.db.add(tables.SecretWord(word="not_cached", game_date=self.date))
 
         # act
         secret = await self.testee.get_secret()
@@ -0,0 +1,71 @@
+import asyncio
+import datetime
+import unittest
+
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from common import tables
+from logic.game_logic import SolverCounter
+from mock.mock_db import MockDb
+
+
+class TestSolverCounter(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.db = await MockDb.create()
+        self.date = datetime.date(2021, 1, 1)
+        await self.db.add(tables.SecretWord(word="test", game_date=self.date))
+        self.testee = SolverCounter(self.db.engine, block_size=3)
+
+    async def get_secret_word(self) -> tables.SecretWord:
+        async with AsyncSession(self.db.engine) as session:
+            query = select(tables.SecretWord)
+            return (await session.exec(query)).one()
+
+    async def test_get_rank(self) -> None:
+        # act
+        ranks = await asyncio.gather(
+            *[self.testee.get_rank(self.date) for _ in range(7)]
+        )
+
+        # assert
+        self.assertEqual([1, 2, 3, 4, 5, 6, 7], ranks)
+        secret_word = await self.get_secret_word()
+        self.assertEqual(9, secret_word.solver_reserved)
+        self.assertEqual(0, secret_word.solver_count)
+
+    async def test_get_rank__unique_across_processes(self) -> None:
+        # arrange
+        other = SolverCounter(self.db.engine, block_size=3)
+
+        # act
+        ranks = [
+            await counter.get_rank(self.date)
+            for counter in [self.testee, other, other, self.testee, other, other]
+        ]
+
+        # assert
+        self.assertEqual([1, 4, 5, 2, 6, 7], ranks)
+
+    async def test_get_rank__after_crash(self) -> None:
+        # arrange
+        await self.testee.get_rank(self.date)
+
+        # act
+        rank = await SolverCounter(self.db.engine, block_size=3).get_rank(self.date)
+
+        # assert
+        self.assertEqual(4, rank)
+
+    async def test_get_rank__next_game(self) -> None:
+        # arrange
+        next_date = self.date + datetime.timedelta(days=1)
+        await self.db.add(tables.SecretWord(word="next", game_date=next_date))
+        await self.testee.get_rank(self.date)
+
+        # act
+        rank = await self.testee.get_rank(next_date)
+
+        # assert
+        self.assertEqual(1, rank)
+        self.assertEqual([next_date], list(self.testee._blocks))
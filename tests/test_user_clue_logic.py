@@ -0,0 +1,84 @@
+import datetime
+import unittest
+from typing import Any
+
+import pytest
+from sqlalchemy import event
+
+from common import tables
+from logic.user_logic import UserClueLogic
+from mock.mock_db import MockDb
+
+
+class TestUserClueLogic(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.db = await MockDb.create()
+        self.user = await self.db.add(
+            tables.User(
+                email="test@test.com",
+                picture="picture",
+                given_name="given",
+                family_name="family",
+            )
+        )
+        self.date = datetime.date(2021, 1, 8)
+        self.testee = UserClueLogic(
+            self.db.session,
+            self.user,
+            secret="סוד",
+            date=self.date,
+            hot_clues=["קלו"],
+        )
+        self.statements: list[str] = []
+        event.listen(
+            self.db.engine.sync_engine, "before_cursor_execute", self.count_statement
+        )
+
+    def count_statement(self, *args: Any) -> None:
+        self.statements.append(args[2])
+
+    async def test_get_clue(self) -> None:
+        # act
+        clues = [await self.testee.get_clue() for _ in range(4)]
+
+        # assert
+        self.assertEqual(
+            [
+                UserClueLogic.CLUE_CHAR_FORMAT.format(clue_char="ו"),
+                UserClueLogic.CLUE_LEN_FORMAT.format(clue_len=3),
+                UserClueLogic.HOT_CLUE_FORMAT.format(hot_clue="קלו"),
+                None,
+            ],
+            clues,
+        )
+        self.assertEqual(clues[:3], await self.testee.get_all_clues_used())
+
+    async def test_get_clue__one_read_and_one_upsert(self) -> None:
+        # arrange
+        await self.testee.get_clue()
+        self.statements.clear()
+
+        # act
+        await self.testee.get_clue()
+
+        # assert
+        self.assertEqual(2, len(self.statements), self.statements)
+        self.assertTrue(self.statements[0].startswith("SELECT"))
+        self.assertTrue(self.statements[1].startswith("INSERT"))
+
+    async def test_get_clue__cooldown_for_unsubscribed(self) -> None:
+        # arrange
+        for days_ago, clue_count in [(7, 3), (6, 2), (1, 2)]:
+            await self.db.add(
+                tables.UserClueCount(
+                    user_id=self.user.id,
+                    game_date=self.date - datetime.timedelta(days=days_ago),
+                    clue_count=clue_count,
+                )
+            )
+        await self.testee.get_clue()
+
+        # act & assert
+        with pytest.raises(ValueError):
+            await self.testee.get_clue()
+        self.assertEqual(1, len(await self.testee.get_all_clues_used()))
@@ -0,0 +1,224 @@
+import asyncio
+import datetime
+import unittest
+
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from common import schemas
+from common import tables
+from logic.user_logic import UserHistoryLogic
+from logic.user_logic import UserHistoryWriter
+from mock.mock_db import MockDb
+
+
+class TestUserHistoryLogic(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        UserHistoryLogic._histories.clear()
+        UserHistoryLogic._latest_date = None
+        self.db = await MockDb.create()
+        self.user = await self.db.add(
+            tables.User(
+                email="test@test.com",
+                picture="picture",
+                given_name="given",
+                family_name="family",
+            )
+        )
+        self.date = datetime.date(2021, 1, 1)
+        self.writer = UserHistoryWriter(self.db.engine, batch_size=2)
+        self.testee = UserHistoryLogic(
+            self.db.session, self.user, self.date, writer=self.writer
+        )
+
+    @staticmethod
+    def guess(word: str) -> schemas.DistanceResponse:
+        return schemas.DistanceResponse(guess=word, similarity=10, distance=-1)
+
+    async def add_db_guess(
+        self, word: str, date: datetime.date | None = None, row_id: int | None = None
+    ) -> None:
+        await self.db.add(
+            tables.UserHistory(
+                id=row_id,
+                user_id=self.user.id,
+                guess=word,
+                similarity=10,
+                distance=-1,
+                game_date=date or self.date,
+            )
+        )
+
+    async def get_db_guesses(self) -> list[str]:
+        query = select(tables.UserHistory.guess).order_by(tables.UserHistory.id)  # type: ignore
+        async with AsyncSession(self.db.engine) as session:
+            return list((await session.exec(query)).all())
+
+    async def test_update_and_get_history__write_behind(self) -> None:
+        # act
+        await self.testee.update_and_get_history(self.guess("אחת"))
+        history = await self.testee.update_and_get_history(self.guess("שתיים"))
+
+        # assert
+        self.assertEqual(["אחת", "שתיים"], [h.guess for h in history])
+        self.assertEqual([], await self.get_db_guesses())
+        self.assertEqual(2, self.writer.queue_depth)
+
+    async def test_flush(self) -> None:
+        # arrange
+        await self.testee.update_and_get_history(self.guess("אחת"))
+        await self.testee.update_and_get_history(self.guess("אחת"))
+        await self.testee.update_and_get_history(self.guess("שתיים"))
+
+        # act
+        await self.writer.flush()
+
+        # assert
+        self.assertEqual(["אחת", "שתיים"], await self.get_db_guesses())
+        history = await self.testee.get_history()
+        self.assertEqual([1, 2], [h.guess_number for h in history])
+        self.assertEqual(0, self.writer.queue_depth)
+        self.assertEqual(2, self.writer.flushed_rows)
+
+    async def test_flush__skips_guesses_already_saved(self) -> None:
+        # arrange
+        self.writer.add(self.user.id, self.date, self.guess("אחת"))
+        await self.add_db_guess("אחת")
+        self.writer.add(self.user.id, self.date, self.guess("שתיים"))
+
+        # act
+        await self.writer.flush()
+
+        # assert
+        self.assertEqual(["אחת", "שתיים"], await self.get_db_guesses())
+
+    async def test_run__flushes_full_batch(self) -> None:
+        # arrange
+        self.writer.flush_interval = 60
+        runner = asyncio.create_task(self.writer.run())
+
+        # act
+        await self.testee.update_and_get_history(self.guess("אחת"))
+        await self.testee.update_and_get_history(self.guess("שתיים"))
+        for _ in range(20):
+            await asyncio.sleep(0.01)
+
+        # assert
+        runner.cancel()
+        self.assertEqual(["אחת", "שתיים"], await self.get_db_guesses())
+        self.assertEqual(1, self.writer.flushes)
+
+    async def test_get_history__reads_only_new_guesses(self) -> None:
+        # arrange
+        await self.add_db_guess("אחת")
+        await self.add_db_guess("שתיים")
+        cached = await self.testee.get_history()
+        await self.add_db_guess("שלוש")
+
+        # act
+        history = await self.testee.get_history()
+
+        # assert
+        self.assertEqual(["אחת", "שתיים", "שלוש"], [h.guess for h in history])
+        self.assertEqual([1, 2, 3], [h.guess_number for h in history])
+        self.assertIs(cached[0], history[0])
+        self.assertIs(cached[1], history[1])
+
+    async def test_get_history__rows_deleted_out_of_band(self) -> None:
+        # arrange
+        await self.add_db_guess("אחת")
+        await self.add_db_guess("שתיים")
+        await self.testee.get_history()
+        async with AsyncSession(self.db.engine) as session:
+            first = (
+                await session.exec(
+                    select(tables.UserHistory).where(tables.UserHistory.guess == "אחת")
+                )
+            ).one()
+            await session.delete(first)
+            await session.commit()
+        await self.add_db_guess("שלוש")
+        await self.add_db_guess("ארבע")
+
+        # act
+        history = await self.testee.get_history()
+
+        # assert
+        self.assertEqual(["שתיים", "שלוש", "ארבע"], [h.guess for h in history])
+        self.assertEqual([1, 2, 3], [h.guess_number for h in history])
+
+    async def test_get_history__rows_committed_out_of_id_order(self) -> None:
+        # arrange
+        await self.add_db_guess("אחת", row_id=1)
+        await self.add_db_guess("שלוש", row_id=3)
+        await self.testee.get_history()
+        # as if flushed late by another worker
+        await self.add_db_guess("שתיים", row_id=2)
+
+        # act
+        history = await self.testee.get_history()
+
+        # assert
+        self.assertEqual(["אחת", "שתיים", "שלוש"], [h.guess for h in history])
+        self.assertEqual([1, 2, 3], [h.guess_number for h in history])
+
+    async def test_update_and_get_history__guess_committed_out_of_id_order(
+        self,
+    ) -> None:
+        # arrange
+        testee = UserHistoryLogic(self.db.session, self.user, self.date)
+        await self.add_db_guess("שתיים", row_id=2)
+        await testee.get_history()
+        await self.add_db_guess("אחת", row_id=1)
+
+        # act
+        history = await testee.update_and_get_history(self.guess("אחת"))
+
+        # assert
+        self.assertEqual(["אחת", "שתיים"], [h.guess for h in history])
+        self.assertEqual(["אחת", "שתיים"], await self.get_db_guesses())
+
+    async def test_update_and_get_history__without_writer(self) -> None:
+        # arrange
+        testee = UserHistoryLogic(self.db.session, self.user, self.date)
+        await testee.update_and_get_history(self.guess("אחת"))
+        await testee.update_and_get_history(self.guess("שתיים"))
+
+        # act
+        history = await testee.update_and_get_history(self.guess("אחת"))
+
+        # assert
+        self.assertEqual(["אחת", "שתיים"], [h.guess for h in history])
+        self.assertEqual(["אחת", "שתיים"], await self.get_db_guesses())
+        cached = UserHistoryLogic._histories.get((self.user.id, self.date))
+        self.assertEqual(2, len(cached[1]) if cached else 0)
+
+    async def test_get_history__evicts_past_games(self) -> None:
+        # arrange
+        await self.testee.get_history()
+        next_date = self.date + datetime.timedelta(days=1)
+        await UserHistoryLogic(self.db.session, self.user, next_date).get_history()
+
+        # act
+        next_next_date = self.date + datetime.timedelta(days=2)
+        await UserHistoryLogic(self.db.session, self.user, next_next_date).get_history()
+
+        # assert
+        self.assertNotIn((self.user.id, self.date), UserHistoryLogic._histories)
+        self.assertIn((self.user.id, next_date), UserHistoryLogic._histories)
+        self.assertIn((self.user.id, next_next_date), UserHistoryLogic._histories)
+
+    async def test_update_and_get_guess(self) -> None:
+        # arrange
+        testee = UserHistoryLogic(self.db.session, self.user, self.date)
+        await testee.update_and_get_guess(self.guess("אחת"))
+        await testee.update_and_get_guess(self.guess("שתיים"))
+
+        # act
+        new_guess = await testee.update_and_get_guess(self.guess("שלוש"))
+        old_guess = await testee.update_and_get_guess(self.guess("אחת"))
+
+        # assert
+        self.assertEqual(("שלוש", 3), (new_guess.guess, new_guess.guess_number))
+        self.assertEqual(("אחת", 1), (old_guess.guess, old_guess.guess_number))
+        self.assertEqual(["אחת", "שתיים", "שלוש"], await self.get_db_guesses())
@@ -0,0 +1,127 @@
+import datetime
+import unittest
+
+from dateutil.relativedelta import relativedelta
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from common import schemas
+from common import tables
+from common.backend import LocalBackend
+from common.cache import AsyncTTLCache
+from logic.user_logic import UserLogic
+from mock.mock_db import MockDb
+
+
+class TestUserLogic(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        UserLogic._users.clear()
+        self.db = await MockDb.create()
+        self.user = await self.db.add(
+            tables.User(
+                email="test@test.com",
+                picture="picture",
+                given_name="given",
+                family_name="family",
+            )
+        )
+        self.now = datetime.datetime.now(datetime.UTC).replace(microsecond=0)
+        self.testee = UserLogic(self.db.session)
+
+    def subscription(
+        self, message_id: str, timestamp: datetime.datetime, amount: int = 3
+    ) -> schemas.Subscription:
+        return schemas.Subscription(
+            verification_token="",
+            message_id=message_id,
+            timestamp=timestamp,
+            email=self.user.email,
+            amount=amount,
+        )
+
+    async def get_expiry(self) -> datetime.datetime | None:
+        user = await self.testee.get_user(self.user.email)
+        assert user is not None
+        return UserLogic.get_subscription_expiry(user)
+
+    async def test_subscribe(self) -> None:
+        # act
+        subscribed = await self.testee.subscribe(self.subscription("a", self.now))
+
+        # assert
+        self.assertTrue(subscribed)
+        self.assertEqual(self.now + relativedelta(months=1), await self.get_expiry())
+
+    async def test_subscribe__extends_active_subscription(self) -> None:
+        # arrange
+        await self.testee.subscribe(self.subscription("a", self.now, amount=1))
+
+        # act
+        await self.testee.subscribe(self.subscription("b", self.now, amount=2))
+
+        # assert
+        self.assertEqual(
+            self.now + datetime.timedelta(days=30), await self.get_expiry()
+        )
+
+    async def test_subscribe__after_expiry(self) -> None:
+        # arrange
+        past = self.now - datetime.timedelta(days=100)
+        await self.testee.subscribe(self.subscription("a", past, amount=1))
+        self.assertIsNone(await self.get_expiry())
+
+        # act
+        await self.testee.subscribe(self.subscription("b", self.now, amount=1))
+
+        # assert
+        self.assertEqual(
+            self.now + datetime.timedelta(days=10), await self.get_expiry()
+        )
+
+    async def test_subscribe__same_message_once(self) -> None:
+        # arrange
+        await self.testee.subscribe(self.subscription("a", self.now))
+
+        # act
+        subscribed = await self.testee.subscribe(self.subscription("a", self.now))
+
+        # assert
+        self.assertFalse(subscribed)
+        async with AsyncSession(self.db.engine) as session:
+            subscriptions = await session.exec(select(tables.UserSubscription))
+            self.assertEqual(1, len(subscriptions.all()))
+
+    async def test_get_user__through_shared_backend(self) -> None:
+        # arrange
+        await self.testee.subscribe(self.subscription("a", self.now))
+        backend = LocalBackend()
+        workers = [
+            AsyncTTLCache[str, tables.User | None](
+                ttl=60,
+                maxsize=1,
+                backend=backend,
+                name="user",
+                dumps=UserLogic._users.dumps,
+                loads=UserLogic._users.loads,
+            )
+            for _ in range(2)
+        ]
+        await workers[0].get(
+            self.user.email, lambda: self.testee.get_user(self.user.email)
+        )
+
+        # act
+        user = await workers[1].get(self.user.email, self.fail_load)
+
+        # assert
+        assert user is not None
+        self.assertIsInstance(user.first_login, datetime.datetime)
+        self.assertIsInstance(user.subscription_expiry, datetime.datetime)
+        self.assertEqual(
+            self.now + relativedelta(months=1),
+            UserLogic.get_subscription_expiry(user),
+        )
+
+    @staticmethod
+    async def fail_load() -> tables.User | None:
+        raise AssertionError("Read from the DB rather than the shared backend")
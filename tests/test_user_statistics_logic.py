@@ -0,0 +1,98 @@
+import datetime
+import unittest
+
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from common import schemas
+from common import tables
+from logic.user_logic import UserHistoryLogic
+from logic.user_logic import UserStatisticsLogic
+from mock.mock_db import MockDb
+
+
+class TestUserStatisticsLogic(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        UserHistoryLogic._histories.clear()
+        UserHistoryLogic._latest_date = None
+        self.db = await MockDb.create()
+        self.user = await self.db.add(
+            tables.User(
+                email="test@test.com",
+                picture="picture",
+                given_name="given",
+                family_name="family",
+            )
+        )
+        self.today = datetime.datetime.now(datetime.UTC).date()
+        self.testee = UserStatisticsLogic(self.db.session, self.user)
+
+    async def play(
+        self, days_ago: int, guesses: list[str], win_rank: int | None = None
+    ) -> None:
+        date = self.today - datetime.timedelta(days=days_ago)
+        history_logic = UserHistoryLogic(self.db.session, self.user, date)
+        for guess in guesses:
+            await history_logic.update_and_get_history(
+                schemas.DistanceResponse(guess=guess, similarity=10, distance=-1)
+            )
+        if win_rank is not None:
+            await history_logic.update_and_get_history(
+                schemas.DistanceResponse(
+                    guess="סוד", similarity=100, distance=1000, solver_count=win_rank
+                )
+            )
+
+    async def test_get_statistics(self) -> None:
+        # arrange
+        await self.play(4, ["אחת"], win_rank=3)
+        await self.play(2, ["אחת", "שתיים", "שלוש"], win_rank=5)
+        await self.play(1, ["אחת"])
+        await self.play(0, ["אחת", "אחת", "שתיים"])
+
+        # act
+        statistics = await self.testee.get_statistics()
+
+        # assert
+        self.assertEqual(
+            schemas.UserStatistics(
+                game_streak=3,
+                highest_rank=3,
+                total_games_played=4,
+                total_games_won=2,
+                average_guesses=3,
+            ),
+            statistics,
+        )
+
+    async def test_get_statistics__streak_broken(self) -> None:
+        # arrange
+        await self.play(3, ["אחת"])
+        await self.play(2, ["אחת"])
+        await self.play(1, ["אחת"])
+
+        # act
+        statistics = await self.testee.get_statistics()
+
+        # assert
+        self.assertEqual(0, statistics.game_streak)
+        self.assertEqual(3, (await self.testee.rebuild()).longest_streak)
+
+    async def test_record_guess__same_as_rebuild(self) -> None:
+        # arrange
+        await self.play(5, ["אחת"])
+        await self.play(3, ["אחת", "שתיים"], win_rank=8)
+        await self.play(2, ["אחת"])
+        await self.play(1, [], win_rank=2)
+        await self.play(0, ["אחת"], win_rank=1)
+        async with AsyncSession(self.db.engine) as session:
+            stats = await session.exec(select(tables.UserStats))
+            recorded = stats.one().model_dump()
+
+        # act
+        rebuilt = (await self.testee.rebuild()).model_dump()
+
+        # assert
+        self.assertEqual(rebuilt, recorded)
+        self.assertEqual(4, rebuilt["current_streak"])
+        self.assertEqual(1, rebuilt["best_rank"])